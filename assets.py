@@ -0,0 +1,280 @@
+import pygame
+import os
+import re
+import json
+
+# Gegenereerd door `python atlas.py`, staat niet in git
+ATLAS_IMAGE = os.path.join("images", "atlas.png")
+ATLAS_INDEX = os.path.join("images", "atlas.json")
+ATLAS_VERSION = 1
+
+# Door loader.py op de achtergrond gedecodeerde bestanden: path -> Surface (nog niet geconvert).
+# decode_image geeft elk bestand 1 keer af en vergeet het dan; de caller bewaart de geconverte versie.
+_decoded = {}
+# Hoe vaak decode_image toch naar schijf moest, zie SceneManager
+io_stats = {'disk_decodes': 0}
+
+
+def store_decoded(path, surface):
+    """Hand a decoded file to the game; only call this from the main thread"""
+    _decoded[os.path.normpath(path)] = surface
+
+
+def forget_file(path):
+    """The file changed on disk: stop serving it from the decoded files and the atlas"""
+    _decoded.pop(os.path.normpath(path), None)
+    sprite_atlas.invalidate(path)
+
+
+def decode_image(path):
+    """pygame.image.load(path), unless the loader already decoded the file (handed out only once)"""
+    surface = _decoded.pop(os.path.normpath(path), None)
+    if surface is None:
+        io_stats['disk_decodes'] += 1
+        surface = pygame.image.load(path)
+    return surface
+
+
+def convert_sprite(img):
+    """Convert a decoded image to the display format, if there is a display"""
+    if pygame.display.get_surface() is not None:
+        try:
+            img = img.convert_alpha()
+        except Exception:
+            img = img.convert()
+    return img
+
+
+def scale_sprite(img, size=None, flip=False):
+    if size is not None:
+        img = pygame.transform.scale(img, size)
+    if flip:
+        img = pygame.transform.flip(img, True, False)
+    return img
+
+
+def load_sprite(path, size=None, flip=False):
+    """Load one image from disk, convert it, then scale and flip it like the atlas does"""
+    return scale_sprite(convert_sprite(decode_image(path)), size, flip)
+
+
+def animation_files(folder, base_name):
+    """Paths of the frames of an animation: base (index 0) then numbered frames"""
+    exts = ["png", "gif", "jpg", "jpeg"]
+    exts_pattern = "|".join(exts)
+    pattern = re.compile(rf'^{re.escape(base_name)}(?: \((\d+)\))?.*\.({exts_pattern})$', re.IGNORECASE)
+
+    candidates = []
+    for fname in os.listdir(folder):
+        m = pattern.match(fname)
+        if m:
+            idx = int(m.group(1)) if m.group(1) else 0
+            candidates.append((idx, os.path.join(folder, fname)))
+
+    candidates.sort(key=lambda t: (t[0], t[1]))
+    return [path for idx, path in candidates]
+
+
+def load_animation(folder, base_name, size=(110, 100), flip=False):
+    """Helper: load base and numbered frames robustly (handles ' - Copy' suffixes).
+
+    Returns list of pygame Surfaces ordered: base (index 0) then numbered frames.
+    """
+    frames = []
+    if not os.path.exists(folder):
+        print(f"Warning: Folder not found: {folder}")
+        return frames
+
+    for path in animation_files(folder, base_name):
+        try:
+            frames.append(load_sprite(path, size, flip))
+        except Exception as e:
+            print(f"Error loading {path}: {e}")
+
+    print(f"Loaded {len(frames)} frames from {folder}")
+    return frames
+
+
+def sprite_key(path, size=None, flip=False):
+    size = f"{size[0]}x{size[1]}" if size else "orig"
+    return f"{os.path.normpath(path)}|{size}|{int(bool(flip))}"
+
+
+def animation_key(folder, base_name, size, flip=False):
+    return f"{os.path.normpath(folder)}|{base_name}|{size[0]}x{size[1]}|{int(bool(flip))}"
+
+
+class SpriteAtlas:
+    """De sprites uit de atlas van atlas.py, als subsurfaces van 1 geladen image.
+
+    Het index bestand bewaart de mtime van elke bron; is er 1 veranderd (of
+    ontbreekt de atlas), dan geeft de atlas niets terug en laadt de game de
+    losse bestanden zoals vroeger.
+    """
+
+    def __init__(self, image_path=ATLAS_IMAGE, index_path=ATLAS_INDEX):
+        self.image_path = image_path
+        self.index_path = index_path
+        self.__loaded = False
+        self.__index = False  # False: nog niet gelezen, None: geen bruikbare atlas
+        self.__sheet = None
+        self.__sprites = {}
+        self.__animations = {}
+        self.__changed = set()  # Bronnen die veranderd zijn terwijl de game draait
+
+    def __stale_source(self, index):
+        for path, mtime in index["sources"].items():
+            try:
+                if os.stat(path).st_mtime_ns != mtime:
+                    return path
+            except OSError:
+                return path
+        return None
+
+    def __read_index(self):
+        if not (os.path.exists(self.index_path) and os.path.exists(self.image_path)):
+            return None
+        try:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+            if index.get("version") != ATLAS_VERSION:
+                print(f"Sprite atlas {self.image_path} has an old format, loading loose files (run python atlas.py)")
+                return None
+            if not all(isinstance(index.get(field), dict) for field in ("sources", "sprites", "animations")):
+                raise KeyError("sources, sprites or animations")
+            stale = self.__stale_source(index)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            # Afgebroken of met de hand aangepast index bestand
+            print(f"Sprite atlas index {self.index_path} is invalid ({e!r}), loading loose files (run python atlas.py)")
+            return None
+        if stale is not None:
+            print(f"Sprite atlas is stale ({stale} changed), loading loose files (run python atlas.py)")
+            return None
+        return index
+
+    def usable(self):
+        """True if the atlas exists and is up to date; only reads the index, does not decode the image"""
+        if self.__index is False:
+            self.__index = self.__read_index()
+        return self.__index is not None
+
+    def __load(self):
+        self.__loaded = True
+        if not self.usable():
+            return
+        index = self.__index
+        sheet = decode_image(self.image_path)
+        if pygame.display.get_surface() is not None:
+            sheet = sheet.convert_alpha()
+        self.__sheet = sheet
+        self.__sprites = {key: tuple(rect) for key, rect in index["sprites"].items()}
+        self.__animations = index["animations"]
+        print(f"Loaded sprite atlas {self.image_path} ({len(self.__sprites)} sprites)")
+
+    def available(self):
+        if not self.__loaded:
+            self.__load()
+        return self.__sheet is not None
+
+    def __subsurface(self, key):
+        rect = self.__sprites.get(key)
+        if rect is None:
+            return None
+        return self.__sheet.subsurface(rect)
+
+    def invalidate(self, path):
+        """Never return the sprites of `path` again, e.g. after it was changed on disk"""
+        self.__changed.add(os.path.normpath(path))
+
+    def sprite(self, path, size=None, flip=False):
+        """Subsurface of the packed sprite, or None if it is not in the atlas"""
+        if os.path.normpath(path) in self.__changed or not self.available():
+            return None
+        return self.__subsurface(sprite_key(path, size, flip))
+
+    def animation(self, folder, base_name, size, flip=False):
+        """List of frame subsurfaces, or None if the animation is not in the atlas"""
+        if not self.available():
+            return None
+        keys = self.__animations.get(animation_key(folder, base_name, size, flip))
+        if keys is None:
+            return None
+        return [self.__subsurface(key) for key in keys]
+
+
+def load_image(path, size=None, flip=False):
+    """Sprite from the atlas if it is there, otherwise loaded from the loose file"""
+    img = sprite_atlas.sprite(path, size, flip)
+    if img is None:
+        img = load_sprite(path, size, flip)
+    return img
+
+
+def load_images(path, sizes, flip=False):
+    """load_image for several sizes of the same file; the loose file is decoded at most once"""
+    images = [sprite_atlas.sprite(path, size, flip) for size in sizes]
+    if None in images:
+        source = convert_sprite(decode_image(path))
+        images = [img if img is not None else scale_sprite(source, size, flip) for img, size in zip(images, sizes)]
+    return images
+
+
+class AnimationCache:
+    """Process-wide cache van animatie frames.
+
+    Elke frame set wordt maar 1 keer van disk geladen, geschaald en geflipt.
+    Zombies krijgen dezelfde (gedeelde) lijst terug, dus het geheugen groeit
+    met het aantal zombie types en niet met het aantal zombies. Bij het laden
+    wordt ook de collision mask van elke frame gemaakt.
+    """
+
+    def __init__(self):
+        self.__frames = {}
+        self.__masks = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __key(self, folder, base_name, size, flip):
+        return (os.path.normpath(folder), base_name, tuple(size), bool(flip))
+
+    def get(self, folder, base_name, size=(110, 100), flip=False):
+        """Return the shared frame list for (folder, base_name, size, flip)"""
+        key = self.__key(folder, base_name, size, flip)
+        frames = self.__frames.get(key)
+        if frames is None:
+            self.misses += 1
+            frames = sprite_atlas.animation(folder, base_name, size, flip)
+            if frames is None:
+                frames = load_animation(folder, base_name, size, flip)
+            self.__frames[key] = frames
+            self.__masks[key] = [pygame.mask.from_surface(frame) for frame in frames]
+        else:
+            self.hits += 1
+        return frames
+
+    def get_masks(self, folder, base_name, size=(110, 100), flip=False):
+        """Return the pygame.mask.Mask of every frame, in the same order as get()"""
+        key = self.__key(folder, base_name, size, flip)
+        if key not in self.__masks:
+            self.get(folder, base_name, size, flip)
+        return self.__masks[key]
+
+    def clear(self):
+        self.__frames.clear()
+        self.__masks.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """Hit/miss counts and how many frame sets/surfaces are in memory"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "frame_sets": len(self.__frames),
+            "surfaces": sum(len(frames) for frames in self.__frames.values()),
+        }
+
+
+# Gedeelde atlas en cache voor het hele proces
+sprite_atlas = SpriteAtlas()
+animation_cache = AnimationCache()
@@ -0,0 +1,124 @@
+"""Pakt alle sprites in 1 atlas image + JSON index, voor een snellere start.
+
+Gebruik: python atlas.py
+
+De sprites worden al geschaald en geflipt zoals de game ze gebruikt, dus bij
+het opstarten is er maar 1 image om te decoderen. De game valt terug op de
+losse bestanden als de atlas ontbreekt of een bron sindsdien veranderd is;
+draai dit dan opnieuw.
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import sys
+import json
+import argparse
+import pygame
+from assets import (ATLAS_IMAGE, ATLAS_INDEX, ATLAS_VERSION, load_sprite, animation_files,
+                    sprite_key, animation_key)
+
+CAR_SIZE = (200, 200)  # Zoals Player de auto schaalt
+UPGRADE_ICON_SIZE = (80, 40)  # Icoon in de garage
+
+
+def sprite_specs():
+    """(path, size, flip) of every single sprite: cars and upgrades"""
+    specs = []
+    for folder in (os.path.join('images', 'truck'), os.path.join('images', 'mustang')):
+        for fname in sorted(os.listdir(folder)):
+            if fname.lower().endswith('.png'):
+                specs.append((os.path.join(folder, fname), CAR_SIZE, False))
+    for folder_name in sorted(os.listdir('upgrades')):
+        img_file = os.path.join('upgrades', folder_name, 'image.png')
+        if os.path.exists(img_file):
+            specs.append((img_file, CAR_SIZE, False))
+            specs.append((img_file, UPGRADE_ICON_SIZE, False))
+    return specs
+
+
+def animation_specs():
+    """(folder, base_name, size, flip) of every zombie animation"""
+    from zombie import ZOMBIE_TYPES
+    specs = []
+    for zombie_type in ZOMBIE_TYPES:
+        specs += zombie_type.animations()
+    return specs
+
+
+def pack(sizes, width=2048, padding=1):
+    """Shelf packing: returns the (x, y) of every size and the height of the atlas"""
+    order = sorted(range(len(sizes)), key=lambda i: -sizes[i][1])
+    positions = [None] * len(sizes)
+    x = y = shelf_height = 0
+    for i in order:
+        w, h = sizes[i]
+        if x + w > width:
+            x = 0
+            y += shelf_height + padding
+            shelf_height = 0
+        positions[i] = (x, y)
+        x += w + padding
+        shelf_height = max(shelf_height, h)
+    return positions, y + shelf_height
+
+
+def build(image_path=ATLAS_IMAGE, index_path=ATLAS_INDEX):
+    pygame.init()
+    # convert_alpha heeft een display nodig, net als in de game
+    pygame.display.set_mode((1, 1))
+
+    keys = []
+    surfaces = []
+    sources = set()
+    for path, size, flip in sprite_specs():
+        keys.append(sprite_key(path, size, flip))
+        surfaces.append(load_sprite(path, size, flip))
+        sources.update((path, os.path.dirname(path)))
+
+    animations = {}
+    for folder, base_name, size, flip in animation_specs():
+        if not os.path.exists(folder):
+            print(f"Warning: Folder not found: {folder}")
+            continue
+        frame_keys = []
+        for path in animation_files(folder, base_name):
+            frame_keys.append(sprite_key(path, size, flip))
+            keys.append(frame_keys[-1])
+            surfaces.append(load_sprite(path, size, flip))
+            sources.add(path)
+        # De map zelf ook, zodat een nieuwe frame de atlas stale maakt
+        sources.add(folder)
+        animations[animation_key(folder, base_name, size, flip)] = frame_keys
+
+    positions, height = pack([surface.get_size() for surface in surfaces])
+    sheet = pygame.Surface((2048, height), pygame.SRCALPHA)
+    sprites = {}
+    for key, surface, pos in zip(keys, surfaces, positions):
+        # MAX op een lege sheet is een exacte kopie, ook van half doorzichtige pixels
+        sheet.blit(surface, pos, special_flags=pygame.BLEND_RGBA_MAX)
+        sprites[key] = [pos[0], pos[1], *surface.get_size()]
+    pygame.image.save(sheet, image_path)
+
+    index = {
+        'version': ATLAS_VERSION,
+        'sources': {os.path.normpath(path): os.stat(path).st_mtime_ns for path in sorted(sources)},
+        'sprites': sprites,
+        'animations': animations,
+    }
+    with open(index_path, 'w') as f:
+        json.dump(index, f, indent=1)
+    pygame.quit()
+    return len(sprites), sheet.get_size()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pack the game sprites into one atlas image')
+    parser.add_argument('--image', default=ATLAS_IMAGE)
+    parser.add_argument('--index', default=ATLAS_INDEX)
+    args = parser.parse_args(argv)
+    count, size = build(args.image, args.index)
+    print(f'Packed {count} sprites into {args.image} ({size[0]}x{size[1]}), index {args.index}')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
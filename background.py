@@ -0,0 +1,102 @@
+"""Achtergrond lagen, 1 keer naar het display formaat geconvert en gedeeld door alle scenes.
+
+Een laag schuift horizontaal mee met de camera, `factor` keer zo snel als de
+wereld (0 = staat stil), en herhaalt zich eindeloos. De wrap-around wordt 1
+keer voorgebakken: een strip met de image en daarachter nog eens het begin,
+een schermbreedte lang. Elke offset is dan 1 blit van een stuk van die strip.
+"""
+import os
+import pygame
+from assets import decode_image
+
+VIEW_SIZE = (1024, 768)
+BACKGROUND_IMAGE = os.path.join('images', 'Background-image.png')
+# (image, factor, y) van achter naar voor. Bij 0.05 schuift de lucht over een
+# heel level (10000 pixels) 500 pixels op, net minder dan de image breder is
+# dan het scherm, dus de naad komt binnen een level niet in beeld.
+LEVEL_LAYERS = [(BACKGROUND_IMAGE, 0.05, 0)]
+
+_images = {}  # (path, size) -> geconverte surface
+_display = None  # Het scherm waarvoor _images geconvert zijn
+
+
+def get_layer_image(path, size=None):
+    """Shared display-format copy of a background image, optionally scaled to `size`"""
+    global _display
+    display = pygame.display.get_surface()
+    if display is None:
+        # Nog geen scherm om naar te converten, dan ook niet bewaren
+        image = decode_image(path)
+        return pygame.transform.scale(image, size) if size else image
+    if display is not _display:
+        # Nieuw scherm (of pygame opnieuw gestart): de oude conversies horen bij het vorige
+        _images.clear()
+        _display = display
+    key = (os.path.normpath(path), size)
+    image = _images.get(key)
+    if image is None:
+        # Is de volle grootte er al (het startscherm), dan die schalen in plaats van opnieuw te decoderen
+        image = _images.get((key[0], None))
+        if image is None:
+            image = decode_image(path)
+        if size:
+            image = pygame.transform.scale(image, size)
+        # Een achtergrond zonder doorzichtige pixels is het snelst zonder alpha
+        if image.get_flags() & pygame.SRCALPHA:
+            image = image.convert_alpha()
+        else:
+            image = image.convert()
+        _images[key] = image
+    return image
+
+
+class ParallaxLayer:
+    """One horizontally wrapping layer that scrolls at `factor` times the camera speed"""
+
+    def __init__(self, image, factor=0.0, y=0):
+        self.image = image
+        self.factor = factor
+        self.y = y
+        self.__strip = None
+
+    def __wrapped(self):
+        if self.__strip is None:
+            width, height = self.image.get_size()
+            # Alleen het stuk dat ooit in beeld kan komen
+            height = min(height, VIEW_SIZE[1] - self.y)
+            flags = self.image.get_flags() & pygame.SRCALPHA
+            strip = pygame.Surface((width + VIEW_SIZE[0], height), flags, self.image)
+            for x in range(0, width + VIEW_SIZE[0], width):
+                # MAX op een lege strip is een exacte kopie, ook van half doorzichtige pixels
+                strip.blit(self.image, (x, 0), special_flags=pygame.BLEND_RGBA_MAX if flags else 0)
+            self.__strip = strip
+        return self.__strip
+
+    def render(self, srf, cam_x=0):
+        if not self.factor and self.image.get_width() >= srf.get_width():
+            # Staat stil: gewoon de image, de strip is niet nodig
+            srf.blit(self.image, (0, self.y))
+            return
+        strip = self.__wrapped()
+        offset = int(cam_x * self.factor) % self.image.get_width()
+        srf.blit(strip, (0, self.y), (offset, 0, srf.get_width(), strip.get_height()))
+
+
+class ParallaxBackground:
+    """Layers drawn back to front"""
+
+    def __init__(self, layers):
+        self.layers = [ParallaxLayer(get_layer_image(path), factor, y) for path, factor, y in layers]
+
+    def render(self, srf, cam_x=0):
+        for layer in self.layers:
+            layer.render(srf, cam_x)
+
+
+def menu_background():
+    """The still background of the start screen"""
+    return ParallaxBackground([(BACKGROUND_IMAGE, 0.0, 0)])
+
+
+def level_background():
+    return ParallaxBackground(LEVEL_LAYERS)
@@ -0,0 +1,232 @@
+"""Benchmarks voor de hot paths van de game, draait zonder venster.
+
+Gebruik: python benchmark.py [--frames 300] [--only zombies] [--output result.json]
+
+Per benchmark worden median, p99 en mean in ms als JSON weggeschreven,
+zodat runs op verschillende commits vergeleken kunnen worden.
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import sys
+import json
+import math
+import time
+import random
+import platform
+import argparse
+import statistics
+import subprocess
+import pygame
+
+
+def time_frames(func, frames):
+    """Call func(frame) `frames` times and return the duration of each call in ms"""
+    samples = []
+    for frame in range(frames):
+        start = time.perf_counter()
+        func(frame)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        'median_ms': statistics.median(ordered),
+        'p99_ms': ordered[min(len(ordered) - 1, math.ceil(len(ordered) * 0.99) - 1)],
+        'mean_ms': statistics.fmean(ordered),
+        'samples': len(ordered),
+    }
+
+
+def new_game():
+    from main import State, Player
+    state = State(1)
+    player = Player(os.path.join('images', 'truck', 'first-car-concept.png'))
+    player.initialize_position(state)
+    return state, player
+
+
+def drive(player, frame, speed=6.5):
+    """Put the car at a position along the level, as if it was driving"""
+    player.world_x = 200 + frame * speed
+    player.prev_world_x = player.world_x
+
+
+def bench_render_frame(srf, frames):
+    from main import render_frame
+    from hud import Hud
+    state, player = new_game()
+    hud = Hud()
+
+    def frame(f):
+        drive(player, f)
+        render_frame(srf, state, player, hud)
+    return time_frames(frame, frames)
+
+
+def bench_draw_ground(srf, frames):
+    from terrain import Terrain
+    terrain = Terrain()
+    return time_frames(lambda f: terrain.draw_ground(srf, 200 + f * 6.5), frames)
+
+
+def bench_draw_ground_polygon(srf, frames):
+    from terrain import Terrain
+    terrain = Terrain()
+    return time_frames(lambda f: terrain.draw_ground_polygon(srf, 200 + f * 6.5), frames)
+
+
+def bench_get_ground_height(srf, frames):
+    """1000 lookups per sample, mix of int and float x around the camera"""
+    from terrain import Terrain
+    terrain = Terrain()
+    rng = random.Random(1)
+    offsets = [rng.uniform(-400, 1400) for _ in range(500)]
+
+    def frame(f):
+        cam_x = 200 + f * 6.5
+        terrain.set_camera(cam_x)
+        for offset in offsets:
+            terrain.get_ground_height(int(cam_x + offset))
+            terrain.get_ground_height(cam_x + offset)
+    return time_frames(frame, frames)
+
+
+def bench_player_update(srf, frames):
+    state, player = new_game()
+    keys = {pygame.K_RIGHT: True, pygame.K_LEFT: False}
+
+    def frame(f):
+        player.update(state, keys)
+        player.fuel = player.max_fuel  # Niet stoppen door lege tank
+    return time_frames(frame, frames)
+
+
+def bench_player_render(srf, frames):
+    state, player = new_game()
+    keys = {pygame.K_RIGHT: True, pygame.K_LEFT: False}
+    for _ in range(frames):
+        player.update(state, keys)
+    # Rijden is al gebeurd, hier alleen renderen over een range van hoeken
+    return time_frames(lambda f: (setattr(player, 'angle', math.sin(f * 0.05) * 12), player.render(srf, state)), frames)
+
+
+def bench_zombies(count):
+    def bench(srf, frames):
+        from zombie import ZombieHorde, ZOMBIE_TYPES
+        state, player = new_game()
+        rng = random.Random(count)
+        state.zombies = ZombieHorde()
+        for _ in range(count):
+            state.zombies.add(rng.randint(800, 10000), rng.randrange(len(ZOMBIE_TYPES)))
+
+        def frame(f):
+            drive(player, f)
+            state.money += state.zombies.update(player, state.terrain)
+            state.zombies.draw(srf, player.world_x, state.terrain)
+        return time_frames(frame, frames)
+    return bench
+
+
+def bench_garage_render(count=None):
+    """Garage with the real upgrades, or with `count` copies of them to check the cost stays flat"""
+    def bench(srf, frames):
+        import copy
+        from main import GarageScreen
+        from upgrades import load_upgrades
+        state, player = new_game()
+        garage = GarageScreen()
+        upgrades = load_upgrades()
+        if count is not None:
+            upgrades = [copy.copy(upgrades[i % len(upgrades)]) for i in range(count)]
+        return time_frames(lambda f: garage.render(srf, player, state, upgrades), frames)
+    return bench
+
+
+def bench_credits_render(srf, frames):
+    from credits import CreditsScreen
+    credits = CreditsScreen()
+    return time_frames(lambda f: credits.render(srf), frames)
+
+
+def bench_background(srf, frames):
+    from background import level_background
+    background = level_background()
+    return time_frames(lambda f: background.render(srf, 200 + f * 6.5), frames)
+
+
+def bench_background_unconverted(srf, frames):
+    """Old path: the decoded image blitted as is, only kept to compare against"""
+    from assets import decode_image
+    from background import BACKGROUND_IMAGE
+    image = decode_image(BACKGROUND_IMAGE)
+    return time_frames(lambda f: srf.blit(image, (0, 0)), frames)
+
+
+BENCHMARKS = {
+    'render_frame': bench_render_frame,
+    'background.render': bench_background,
+    'background.render_unconverted': bench_background_unconverted,
+    'terrain.draw_ground': bench_draw_ground,
+    'terrain.draw_ground_polygon': bench_draw_ground_polygon,
+    'terrain.get_ground_height_x1000': bench_get_ground_height,
+    'player.update': bench_player_update,
+    'player.render': bench_player_render,
+    'zombies.update_draw_10': bench_zombies(10),
+    'zombies.update_draw_1000': bench_zombies(1000),
+    'zombies.update_draw_5000': bench_zombies(5000),
+    'zombies.update_draw_10000': bench_zombies(10000),
+    'garage.render': bench_garage_render(),
+    'garage.render_300_upgrades': bench_garage_render(300),
+    'credits.render': bench_credits_render,
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(frames=300, only=None):
+    pygame.init()
+    srf = pygame.display.set_mode((1024, 768))
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if only and not any(part in name for part in only):
+            continue
+        results[name] = summarize(bench(srf, frames))
+    pygame.quit()
+    return {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'video_driver': os.environ.get('SDL_VIDEODRIVER'),
+        'frames': frames,
+        'results': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the hot render and update paths')
+    parser.add_argument('--frames', type=int, default=300, help='samples per benchmark')
+    parser.add_argument('--only', nargs='*', help='only run benchmarks whose name contains one of these')
+    parser.add_argument('--output', help='write the JSON to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    report = run(args.frames, args.only)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+        for name, result in report['results'].items():
+            print(f"{name:34} median {result['median_ms']:8.3f} ms  p99 {result['p99_ms']:8.3f} ms")
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
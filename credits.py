@@ -1,23 +1,28 @@
 import pygame
+from background import get_layer_image, BACKGROUND_IMAGE
+from fonts import get_font
 
 class CreditsScreen:
-    def __init__(self):
-        # Zorg dat pygame.font geïnitialiseerd is
-        if not pygame.font.get_init():
-            pygame.font.init()
-        
+    """Credits met de achtergrond + overlay en alle tekst elk 1 keer voorgerenderd.
+
+    Per frame zijn het 2 blits, hoe lang de lijst ook is. Met auto_scroll
+    schuift de tekst vanzelf omhoog en begint hij onderaan opnieuw.
+    """
+
+    def __init__(self, auto_scroll=False):
         # Import Button hier zodat pygame al geïnitialiseerd is
         from main import Button
         
         try:
-            bg_raw = pygame.image.load('images/Background-image.png')
-            self.__background = pygame.transform.scale(bg_raw, (1024, 768))
+            background = get_layer_image(BACKGROUND_IMAGE, (1024, 768))
         except:
-            self.__background = None
+            background = None
+        self.__backdrop = self.__bake_backdrop(background)
         
-        self.__title_font = pygame.font.Font(None, 72)
-        self.__section_font = pygame.font.Font(None, 48)
-        self.__text_font = pygame.font.Font(None, 32)
+        # get_font zorgt ook dat pygame.font geïnitialiseerd is
+        self.__title_font = get_font(None, 72)
+        self.__section_font = get_font(None, 48)
+        self.__text_font = get_font(None, 32)
         
         # Back button
         self.__back_button = Button(20, 20, 120, 50, 'Back', (70, 70, 70), (100, 100, 100))
@@ -41,9 +46,81 @@ class CreditsScreen:
         
         self.scroll_y = 0
         self.scroll_speed = 20
+        self.auto_scroll = auto_scroll
+        self.auto_scroll_speed = 1  # Pixels per frame
+        
+        # Tekst als 1 hoge surface, opnieuw gemaakt als credits_content verandert
+        self.__content = None
+        self.__content_key = None
+        
+        # Voor dirty-rect rendering
+        self.__shown_scroll_y = None
+        self.__full_redraw = True
+    
+    def invalidate(self):
+        """Redraw the whole screen on the next render_dirty"""
+        self.__full_redraw = True
+    
+    def __bake_backdrop(self, background):
+        backdrop = pygame.Surface((1024, 768))
+        if background:
+            backdrop.blit(background, (0, 0))
+        else:
+            backdrop.fill((30, 30, 30))
+        # Semi-transparante overlay, 1 keer in de achtergrond gebakken
+        overlay = pygame.Surface((1024, 768))
+        overlay.set_alpha(150)
+        overlay.fill((0, 0, 0))
+        backdrop.blit(overlay, (0, 0))
+        if pygame.display.get_surface() is not None:
+            backdrop = backdrop.convert()
+        return backdrop
+    
+    def __render_content(self):
+        """All credit lines in one tall transparent surface; y 0 is the top of the screen at scroll 0"""
+        lines = []
+        y_offset = 100
+        for item in self.credits_content:
+            if item["type"] == "title":
+                lines.append((self.__title_font.render(item["text"], True, (255, 255, 255)), y_offset))
+                y_offset += 80
+            
+            elif item["type"] == "section":
+                lines.append((self.__section_font.render(item["text"], True, (255, 200, 0)), y_offset))
+                y_offset += 60
+            
+            elif item["type"] == "text":
+                lines.append((self.__text_font.render(item["text"], True, (200, 200, 200)), y_offset))
+                y_offset += 40
+            
+            elif item["type"] == "space":
+                y_offset += 30
+        # Zo smal als de breedste regel, gecentreerd op het scherm geblit
+        width = max([text.get_width() for text, y in lines], default=1)
+        content = pygame.Surface((width, y_offset), pygame.SRCALPHA)
+        for text, y in lines:
+            content.blit(text, text.get_rect(center=(width // 2, y)))
+        return content
+    
+    def __content_surface(self):
+        # Een nieuwe lijst of een regel erbij/eraf; na het aanpassen van een regel zelf: invalidate_content()
+        key = (id(self.credits_content), len(self.credits_content))
+        if key != self.__content_key:
+            self.__content = self.__render_content()
+            self.__content_key = key
+        return self.__content
+    
+    def invalidate_content(self):
+        """Render the credits text again on the next frame, after editing credits_content in place"""
+        self.__content_key = None
     
     def update(self, mouse_pos):
         self.__back_button.update(mouse_pos)
+        if self.auto_scroll:
+            self.scroll_y -= self.auto_scroll_speed
+            if self.scroll_y < -self.__content_surface().get_height():
+                # Alles is voorbij gescrold, onderaan opnieuw beginnen
+                self.scroll_y = 768
     
     def handle_click(self, mouse_pos, mouse_clicked):
         if self.__back_button.is_clicked(mouse_pos, mouse_clicked):
@@ -51,47 +128,35 @@ class CreditsScreen:
         return None
     
     def handle_scroll(self, direction):
+        # Zelf scrollen stopt het automatisch scrollen
+        self.auto_scroll = False
         self.scroll_y += direction * self.scroll_speed
         # Begrens scrollen
         self.scroll_y = min(0, self.scroll_y)
     
     def render(self, srf):
-        # Background
-        if self.__background:
-            srf.blit(self.__background, (0, 0))
-        else:
-            srf.fill((30, 30, 30))
-        
-        # Semi-transparante overlay
-        overlay = pygame.Surface((1024, 768))
-        overlay.set_alpha(150)
-        overlay.fill((0, 0, 0))
-        srf.blit(overlay, (0, 0))
+        # Achtergrond met de overlay er al in
+        srf.blit(self.__backdrop, (0, 0))
         
         # Back button
         self.__back_button.render(srf)
         
-        # Render credits content
-        y_offset = 100 + self.scroll_y
-        
-        for item in self.credits_content:
-            if item["type"] == "title":
-                text = self.__title_font.render(item["text"], True, (255, 255, 255))
-                text_rect = text.get_rect(center=(512, y_offset))
-                srf.blit(text, text_rect)
-                y_offset += 80
-            
-            elif item["type"] == "section":
-                text = self.__section_font.render(item["text"], True, (255, 200, 0))
-                text_rect = text.get_rect(center=(512, y_offset))
-                srf.blit(text, text_rect)
-                y_offset += 60
-            
-            elif item["type"] == "text":
-                text = self.__text_font.render(item["text"], True, (200, 200, 200))
-                text_rect = text.get_rect(center=(512, y_offset))
-                srf.blit(text, text_rect)
-                y_offset += 40
-            
-            elif item["type"] == "space":
-                y_offset += 30
+        # Credits content: pygame clipt de blit tot het scherm, dus lange lijsten kosten niets extra
+        content = self.__content_surface()
+        srf.blit(content, (512 - content.get_width() // 2, self.scroll_y))
+    
+    def render_dirty(self, srf):
+        """Only redraw what changed, returns the changed rects for pygame.display.update"""
+        button_rect = self.__back_button.dirty_rect()
+        if self.__full_redraw or self.scroll_y != self.__shown_scroll_y:
+            # Scrollen verschuift alle tekst, dan alles opnieuw
+            self.__full_redraw = False
+            self.__shown_scroll_y = self.scroll_y
+            self.render(srf)
+            return [srf.get_rect()]
+        if button_rect is None:
+            return []
+        srf.set_clip(button_rect)
+        self.render(srf)
+        srf.set_clip(None)
+        return [button_rect]
@@ -0,0 +1,18 @@
+"""Gedeelde fonts voor het hele proces: elk (face, size) wordt maar 1 keer geladen."""
+import pygame
+
+_fonts = {}
+
+
+def get_font(face=None, size=36):
+    """Shared pygame.font.Font for (face, size); face None is the default pygame font"""
+    if not pygame.font.get_init():
+        # Na pygame.quit() zijn de oude fonts ongeldig
+        _fonts.clear()
+        pygame.font.init()
+    key = (face, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = pygame.font.Font(face, size)
+        _fonts[key] = font
+    return font
@@ -0,0 +1,216 @@
+"""Speel de gameplay loop zonder venster, voor profilen en soak tests op een server.
+
+Gebruik: python headless.py --frames 36000 --script run.txt [--render]
+
+Een key script heeft per regel een aantal frames en de toetsen die dan
+ingedrukt zijn (pygame namen zonder K_), bv:
+
+    # 10 seconden gas geven, 1 seconde niets, 2 seconden achteruit
+    600 RIGHT
+    60
+    120 LEFT
+
+Na het einde van het script worden geen toetsen meer ingedrukt.
+
+Met --replay wordt een opname van main.py --record afgespeeld (zie replay.py),
+stap voor stap en zo snel als het gaat, met de tijd per stap in de output.
+"""
+import os
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
+import sys
+import json
+import time
+import argparse
+import pygame
+
+
+class ScriptedKeys:
+    """Stands in for pygame.key.get_pressed(): keys[pygame.K_RIGHT] -> bool"""
+
+    def __init__(self, pressed=()):
+        self.__pressed = frozenset(pressed)
+
+    def __getitem__(self, key):
+        return key in self.__pressed
+
+
+class KeyScript:
+    """Per-frame key input as a list of (frames, keys) segments"""
+
+    def __init__(self, segments):
+        self.segments = [(int(frames), ScriptedKeys(keys)) for frames, keys in segments]
+        self.total_frames = sum(frames for frames, keys in self.segments)
+        self.__released = ScriptedKeys()
+
+    @classmethod
+    def parse(cls, text):
+        segments = []
+        for line_no, line in enumerate(text.splitlines(), 1):
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            frames, *names = line.split()
+            keys = []
+            for name in names:
+                key = getattr(pygame, 'K_' + name.upper(), None) or getattr(pygame, 'K_' + name, None)
+                if key is None:
+                    raise ValueError(f'Line {line_no}: unknown key {name!r}')
+                keys.append(key)
+            segments.append((int(frames), keys))
+        return cls(segments)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as f:
+            return cls.parse(f.read())
+
+    def keys_at(self, frame):
+        for frames, keys in self.segments:
+            if frame < frames:
+                return keys
+            frame -= frames
+        return self.__released
+
+
+def run_headless(script, frames=None, render=False, level=1, seed=None):
+    """Simulate `frames` fixed steps as fast as possible and return the run stats"""
+    from main import State, Player, update_gameplay, start_next_level, render_frame, create_main_surface
+    from hud import Hud
+
+    pygame.init()
+    # Ook zonder renderen is er een display nodig voor convert_alpha
+    srf = create_main_surface()
+    hud = Hud() if render else None
+    state = State(level, seed=seed)
+    player = Player(os.path.join('images', 'truck', 'first-car-concept.png'))
+    player.initialize_position(state)
+    # Gedraaide auto's, masks en zombie frames horen niet bij de gemeten tijd
+    player.prewarm_rotations()
+    state.zombies.prewarm()
+    if frames is None:
+        frames = script.total_frames
+
+    outcome = None
+    levels_completed = 0
+    level_pools = []  # pool_stats() van elk afgewerkt level
+    simulated = 0
+    start = time.perf_counter()
+    for frame in range(frames):
+        outcome = update_gameplay(state, player, script.keys_at(frame))
+        simulated += 1
+        if render:
+            render_frame(srf, state, player, hud)
+        if outcome == 'level_complete':
+            levels_completed += 1
+            level_pools.append(state.zombies.pool_stats())
+            state, player = start_next_level(state, player)
+        elif outcome == 'game_over':
+            break
+    elapsed = time.perf_counter() - start
+
+    stats = {
+        'frames': simulated,
+        'seconds': elapsed,
+        'simulated_fps': simulated / elapsed if elapsed > 0 else 0.0,
+        'rendered': render,
+        'outcome': outcome,
+        'level': state.level,
+        'seed': state.seed,
+        'levels_completed': levels_completed,
+        'distance': player.world_x,
+        'money': state.money,
+        'health': player.health,
+        'fuel': player.fuel,
+        'zombie_pool': state.zombies.pool_stats(),
+        'zombie_pool_completed_levels': level_pools,
+    }
+    pygame.quit()
+    return stats
+
+
+def run_replay(recording, render=False):
+    """Play a Recording back step by step; returns the timings and whether every level ended the same"""
+    from main import State, Player, update_gameplay, render_frame, create_main_surface
+    from upgrades import load_upgrades
+    from replay import segment_result
+    from benchmark import summarize
+    from hud import Hud
+
+    pygame.init()
+    srf = create_main_surface()
+    hud = Hud() if render else None
+    upgrades = {upgrade.name: upgrade for upgrade in load_upgrades()}
+    state = State()
+    player = Player(os.path.join('images', 'truck', 'first-car-concept.png'))
+    # Zombie frames, masks en tabellen horen niet bij step_ms
+    state.zombies.prewarm()
+    step_ms = []
+    segments = []
+    start = time.perf_counter()
+    for segment in recording.segments:
+        # Elk level op dezelfde state en player, zoals in de game
+        state.reset(segment.level, segment.seed)
+        state.money = segment.money
+        player.reset(keep_upgrades=False)
+        for name in segment.upgrades:
+            player.apply_upgrade(upgrades[name])
+        # Een upgrade geeft een andere auto image, dus opnieuw draaien voor step_ms begint
+        player.prewarm_rotations()
+        player.initialize_position(state)
+
+        outcome = None
+        for keys in segment.key_frames():
+            step_start = time.perf_counter()
+            outcome = update_gameplay(state, player, keys)
+            if render:
+                render_frame(srf, state, player, hud)
+            step_ms.append((time.perf_counter() - step_start) * 1000)
+            if outcome:
+                break
+        result = segment_result(outcome, state, player)
+        segments.append({
+            'level': segment.level,
+            'frames': segment.frames,
+            'result': result,
+            'recorded': segment.result,
+            'matches': segment.result is None or result == segment.result,
+        })
+    elapsed = time.perf_counter() - start
+    pygame.quit()
+
+    return {
+        'frames': len(step_ms),
+        'seconds': elapsed,
+        'simulated_fps': len(step_ms) / elapsed if elapsed > 0 else 0.0,
+        'rendered': render,
+        'step': summarize(step_ms) if step_ms else None,
+        'matches': all(segment['matches'] for segment in segments),
+        'segments': segments,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the gameplay loop without a window')
+    parser.add_argument('--script', help='key script file (default: hold RIGHT)')
+    parser.add_argument('--frames', type=int, help='number of simulation frames (default: length of the script)')
+    parser.add_argument('--render', action='store_true', help='also render every frame (to the dummy display)')
+    parser.add_argument('--level', type=int, default=1)
+    parser.add_argument('--seed', type=int, help='zombie seed of the first level (default: random)')
+    parser.add_argument('--replay', help='play back a recording made with main.py --record')
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        from replay import Recording
+        print(json.dumps(run_replay(Recording.load(args.replay), args.render), indent=2))
+        return
+    if args.script:
+        script = KeyScript.load(args.script)
+    else:
+        script = KeyScript([(args.frames or 3600, [pygame.K_RIGHT])])
+    stats = run_headless(script, args.frames, args.render, args.level, args.seed)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,78 @@
+import pygame
+from fonts import get_font
+
+class Hud:
+    """HUD tijdens het spelen: health/fuel bars, afstand, geld en fuel tekst.
+
+    Alles wordt op een eigen surface getekend. Per frame wordt alleen het stuk
+    opnieuw getekend waarvan de getoonde waarde veranderd is, en getallen
+    worden uit voorgerenderde cijfers samengezet: tijdens het rijden verandert
+    bijna elk frame alleen de afstand, en dat zijn dan een paar blits.
+    """
+
+    def __init__(self):
+        self.__font = get_font(None, 36)
+        self.__small_font = get_font(None, 28)
+        self.__surface = pygame.Surface((1024, 110), pygame.SRCALPHA)
+        self.__texts = {}  # (font, tekst) -> surface, alleen labels en losse cijfers dus blijft klein
+        self.__shown = {}  # Regio -> waarde die er nu getekend staat
+        self.__money_left = 1024 - 10  # Linkerkant van het geld, de afstand staat daar links van
+        self.__bars_rect = pygame.Rect(0, 0, 240, 110)
+        self.__line_rect = pygame.Rect(240, 10, 1024 - 240, self.__font.get_height())
+        self.__fuel_rect = pygame.Rect(240, 50, 1024 - 240, self.__small_font.get_height())
+        self.redraws = 0  # Aantal keer dat een regio opnieuw getekend is
+
+    def __render_text(self, font, text):
+        key = (id(font), text)
+        surface = self.__texts.get(key)
+        if surface is None:
+            surface = font.render(text, True, (255, 255, 255))
+            self.__texts[key] = surface
+        return surface
+
+    def __blit_right(self, font, pieces, right, y):
+        """Blit the pieces so they end at x `right`: strings as 1 label, ints digit by digit.
+
+        Returns the x where the first piece starts.
+        """
+        x = right
+        for piece in reversed(pieces):
+            text = str(piece)
+            glyphs = text if isinstance(piece, int) else [text]
+            for glyph_text in reversed(glyphs):
+                glyph = self.__render_text(font, glyph_text)
+                x -= glyph.get_width()
+                self.__surface.blit(glyph, (x, y))
+        return x
+
+    def __redraw(self, name, value):
+        if self.__shown.get(name) == value:
+            return False
+        self.__shown[name] = value
+        self.redraws += 1
+        return True
+
+    def render(self, srf, player, state):
+        # Alleen wat echt op het scherm komt telt, zelfde afronding als bij het tekenen
+        bars = (int((player.health / player.max_health) * 200), int((player.fuel / player.max_fuel) * 200))
+        if self.__redraw('bars', bars):
+            self.__surface.fill((0, 0, 0, 0), self.__bars_rect)
+            player.draw_health_bar(self.__surface)
+            player.draw_fuel_bar(self.__surface)
+
+        # Distance and money top right; het geld staat rechts, dus de afstand kan los opnieuw
+        line = self.__line_rect
+        if self.__redraw('money', state.money):
+            self.__surface.fill((0, 0, 0, 0), line)
+            self.__money_left = self.__blit_right(self.__font, ['  Money: $', state.money], line.right - 10, line.y)
+            self.__shown.pop('distance', None)
+        if self.__redraw('distance', int(player.world_x)):
+            self.__surface.fill((0, 0, 0, 0), (line.x, line.y, self.__money_left - line.x, line.height))
+            self.__blit_right(self.__font, ['Distance: ', int(player.world_x)], self.__money_left, line.y)
+
+        # Fuel percentage top right below distance
+        if self.__redraw('fuel', int(player.fuel)):
+            self.__surface.fill((0, 0, 0, 0), self.__fuel_rect)
+            self.__blit_right(self.__small_font, ['Fuel: ', int(player.fuel), '%'], self.__fuel_rect.right - 10,
+                              self.__fuel_rect.y)
+        srf.blit(self.__surface, (0, 0))
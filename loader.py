@@ -0,0 +1,115 @@
+"""Decodeert de assets op een thread pool terwijl het startscherm al getoond wordt.
+
+De bestanden worden per groep aangevraagd, in de volgorde waarin de schermen
+bereikbaar zijn: eerst het startscherm, dan de garage, de credits en als
+laatste het level zelf. De threads doen alleen pygame.image.load (dat de GIL
+loslaat); de resultaten gaan via een queue terug en poll() geeft ze op de
+main thread aan assets.store_decoded. Converten, schalen en de schermen maken
+gebeurt dus altijd op de main thread.
+"""
+import os
+import queue
+import pygame
+from concurrent.futures import ThreadPoolExecutor
+from assets import sprite_atlas, store_decoded, animation_files, ATLAS_IMAGE
+
+CAR_IMAGE = os.path.join('images', 'truck', 'first-car-concept.png')
+
+
+def asset_groups():
+    """[(group, [paths])] in the order the scenes can be reached from the start screen"""
+    background = os.path.join('images', 'Background-image.png')
+    start = [background, os.path.join('images', 'UI', 'logo.png'), os.path.join('images', 'UI', 'settings-icon.png')]
+    garage = [os.path.join('images', 'Background-image-garage.png')]
+    playing = []
+    if sprite_atlas.usable():
+        # Auto, upgrades en zombies zitten allemaal in de atlas
+        garage.append(ATLAS_IMAGE)
+    else:
+        garage.append(CAR_IMAGE)
+        if os.path.exists('upgrades'):
+            for folder_name in sorted(os.listdir('upgrades')):
+                img_file = os.path.join('upgrades', folder_name, 'image.png')
+                if os.path.exists(img_file):
+                    garage.append(img_file)
+        from zombie import ZOMBIE_TYPES
+        for zombie_type in ZOMBIE_TYPES:
+            for folder, base_name, size, flip in zombie_type.animations():
+                if os.path.exists(folder):
+                    playing += animation_files(folder, base_name)
+    # De credits hebben dezelfde achtergrond als het startscherm, die is er dan al
+    return [('start', start), ('garage', garage), ('credits', [background]), ('playing', playing)]
+
+
+class AssetLoader:
+    """Decodes the files of asset_groups() on a thread pool, group by group"""
+
+    def __init__(self, groups, workers=4):
+        self.__pending = {group: set(map(os.path.normpath, paths)) for group, paths in groups}
+        self.__order = [group for group, paths in groups]
+        self.__results = queue.Queue()
+        self.__executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='assets')
+        self.__submitted = set()
+        self.__next_group = 0
+        self.total = len(set().union(*self.__pending.values()))
+        self.loaded = 0
+        self.__submit_next()
+
+    def __submit_next(self):
+        # Een groep pas starten als de vorige klaar is, anders vechten ze om dezelfde cores
+        while self.__next_group < len(self.__order):
+            group = self.__order[self.__next_group]
+            if self.__next_group and not self.ready(self.__order[self.__next_group - 1]):
+                return
+            for path in sorted(self.__pending[group] - self.__submitted):
+                self.__submitted.add(path)
+                self.__executor.submit(self.__decode, path)
+            self.__next_group += 1
+
+    def __decode(self, path):
+        # Draait op een worker thread: niets anders aanraken dan het bestand zelf
+        try:
+            self.__results.put((path, pygame.image.load(path), None))
+        except Exception as e:
+            self.__results.put((path, None, e))
+
+    def __handle(self, result):
+        path, surface, error = result
+        if surface is not None:
+            store_decoded(path, surface)
+        else:
+            # Het scherm dat het nodig heeft laadt het dan zelf en krijgt dezelfde fout
+            print(f"Error loading {path}: {error}")
+        self.loaded += 1
+        for paths in self.__pending.values():
+            paths.discard(path)
+        self.__submit_next()
+
+    def poll(self):
+        """Hand the decoded files to the game, call this on the main thread every frame"""
+        handled = 0
+        while True:
+            try:
+                result = self.__results.get_nowait()
+            except queue.Empty:
+                return handled
+            self.__handle(result)
+            handled += 1
+
+    def ready(self, group):
+        return not self.__pending[group]
+
+    def wait(self, group):
+        """Block until every file of `group` is decoded"""
+        self.poll()
+        while not self.ready(group):
+            self.__handle(self.__results.get())
+
+    def done(self):
+        return self.loaded == self.total
+
+    def progress(self):
+        return self.loaded / self.total if self.total else 1.0
+
+    def shutdown(self):
+        self.__executor.shutdown(wait=False, cancel_futures=True)
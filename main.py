@@ -1,15 +1,30 @@
 import pygame 
 import math
 import os
+import random
+import time
+import argparse
 from player import Player
-from zombie import Zombie, spawn_zombies
+from zombie import ZombieHorde, ZombieSpawner
 from terrain import Terrain
-from upgrades import Upgrade, load_upgrades
+from upgrades import Upgrade, UpgradeCatalog
 from credits import CreditsScreen
+from hud import Hud
+from timestep import FixedTimestep, FrameStats
+from profiler import FrameProfiler, NULL_PROFILER
+from replay import Recorder
+from assets import decode_image, convert_sprite
+from loader import AssetLoader, asset_groups
+from fonts import get_font
+from background import menu_background, level_background, get_layer_image
+from scenes import Scene, SceneManager
+
+START_MONEY = 500  # Geld aan het begin van een run
+UPGRADE_REFRESH_FRAMES = 60  # Zo vaak kijkt de garage of de upgrade mappen veranderd zijn
 
 class Logo:
     def __init__(self, image_path, x, y, width=None, height=None):
-        self.__image = pygame.image.load(image_path)
+        self.__image = convert_sprite(decode_image(image_path))
         if width and height:
             self.__image = pygame.transform.scale(self.__image, (width, height))
         self.__x = x
@@ -26,13 +41,17 @@ class Button:
         self.__hover_color = hover_color
         self.__text_color = text_color
         self.__is_hovered = False
-        self.__font = pygame.font.Font(None, 36)
+        self.__dirty = False  # Hover state veranderd sinds de laatste dirty_rect()
+        self.__font = get_font(None, 36)
         self.__icon = None
         if icon_path:
-            self.__icon = pygame.image.load(icon_path)
+            self.__icon = decode_image(icon_path)
             # Beetje padding adden zodat het settings icoon past
             icon_size = min(width - 10, height - 10)
             self.__icon = pygame.transform.scale(self.__icon, (int(icon_size), int(icon_size)))
+        # Beide toestanden 1 keer voorgerenderd, render() is dan 1 blit
+        self.__normal_surface = self.__render_state(self.__color)
+        self.__hover_surface = self.__render_state(self.__hover_color)
     
     def is_clicked(self, mouse_pos, mouse_pressed):
         if self.__rect.collidepoint(mouse_pos) and mouse_pressed[0]:
@@ -40,36 +59,50 @@ class Button:
         return False
     
     def update(self, mouse_pos):
-        self.__is_hovered = self.__rect.collidepoint(mouse_pos)
+        is_hovered = bool(self.__rect.collidepoint(mouse_pos))
+        if is_hovered != self.__is_hovered:
+            self.__is_hovered = is_hovered
+            self.__dirty = True
     
-    def render(self, srf):
-        color = self.__hover_color if self.__is_hovered else self.__color
-        pygame.draw.rect(srf, color, self.__rect)
-        pygame.draw.rect(srf, (255, 255, 255), self.__rect, 2)  # Border
+    def dirty_rect(self):
+        """Return the button rect if it changed since the last call, else None"""
+        if not self.__dirty:
+            return None
+        self.__dirty = False
+        return self.__rect.copy()
+    
+    def __render_state(self, color):
+        surface = pygame.Surface(self.__rect.size)
+        rect = surface.get_rect()
+        pygame.draw.rect(surface, color, rect)
+        pygame.draw.rect(surface, (255, 255, 255), rect, 2)  # Border
         
         if self.__icon:
             # Icoon centreren in de button
-            icon_rect = self.__icon.get_rect(center=self.__rect.center)
-            srf.blit(self.__icon, icon_rect)
+            icon_rect = self.__icon.get_rect(center=rect.center)
+            surface.blit(self.__icon, icon_rect)
         
         if self.__text:
             text_surface = self.__font.render(self.__text, True, self.__text_color)
-            text_rect = text_surface.get_rect(center=self.__rect.center)
-            srf.blit(text_surface, text_rect)
-
-class Background: 
-    def __init__(self, image):
-        self.__image = self.__create_image(image)
-
-    def __create_image(self, image):
-        return pygame.image.load(image)
+            text_rect = text_surface.get_rect(center=rect.center)
+            surface.blit(text_surface, text_rect)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        return surface
     
     def render(self, srf):
-        srf.blit(self.__image, (0, 0))
-    
+        srf.blit(self.__hover_surface if self.__is_hovered else self.__normal_surface, self.__rect)
+
+def redraw_regions(srf, rects, render):
+    """Call render() once per rect with the surface clipped to that rect"""
+    for rect in rects:
+        srf.set_clip(rect)
+        render()
+    srf.set_clip(None)
+
 class StartScreen:
     def __init__(self):
-        self.__background = Background(os.path.join('images', 'Background-image.png'))
+        self.__background = menu_background()
         self.__logo = Logo(os.path.join('images', 'UI', 'logo.png'), 112, 100, 800, 500)
         
         # Buttons - horizontaal naast elkaar, lager op scherm
@@ -77,6 +110,21 @@ class StartScreen:
         self.__credits_button = Button(412, 600, 200, 60, 'Credits', (100, 100, 50), (150, 150, 70))
         self.__quit_button = Button(662, 600, 200, 60, 'Quit', (150, 50, 50), (200, 70, 70))
         self.__settings_button = Button(954, 10, 60, 60, '', (50, 50, 150), (70, 70, 200), icon_path=os.path.join('images', 'UI', 'settings-icon.png'))
+        self.__buttons = [self.__start_button, self.__credits_button, self.__quit_button, self.__settings_button]
+        self.__full_redraw = True
+        self.__progress = 1.0  # Hoever de assets op de achtergrond geladen zijn
+        self.__progress_rect = pygame.Rect(312, 690, 400, 16)
+        self.__progress_dirty = False
+    
+    def invalidate(self):
+        """Redraw the whole screen on the next render_dirty"""
+        self.__full_redraw = True
+    
+    def set_progress(self, progress):
+        """Loading progress from 0 to 1; the bar disappears when it reaches 1"""
+        if progress != self.__progress:
+            self.__progress = progress
+            self.__progress_dirty = True
         
     def update(self, mouse_pos):
         self.__start_button.update(mouse_pos)
@@ -102,18 +150,37 @@ class StartScreen:
         self.__credits_button.render(srf)
         self.__quit_button.render(srf)
         self.__settings_button.render(srf)
+        if self.__progress < 1:
+            bar = self.__progress_rect
+            pygame.draw.rect(srf, (40, 40, 40), bar)
+            pygame.draw.rect(srf, (70, 200, 70), (bar.x, bar.y, int(bar.width * self.__progress), bar.height))
+            pygame.draw.rect(srf, (255, 255, 255), bar, 2)
+    
+    def render_dirty(self, srf):
+        """Only redraw what changed, returns the changed rects for pygame.display.update"""
+        dirty = [button.dirty_rect() for button in self.__buttons]
+        if self.__progress_dirty:
+            self.__progress_dirty = False
+            dirty.append(self.__progress_rect.copy())
+        if self.__full_redraw:
+            self.__full_redraw = False
+            clear_surface(srf)
+            self.render(srf)
+            return [srf.get_rect()]
+        rects = [rect for rect in dirty if rect]
+        redraw_regions(srf, rects, lambda: self.render(srf))
+        return rects
 
 class GarageScreen:
     def __init__(self):
         try:
-            garage_bg_raw = pygame.image.load(os.path.join('images', 'Background-image-garage.png'))
-            self.__background = pygame.transform.scale(garage_bg_raw, (1024, 768))
+            self.__background = get_layer_image(os.path.join('images', 'Background-image-garage.png'), (1024, 768))
         except:
             self.__background = None
         
-        self.__title_font = pygame.font.Font(None, 48)
-        self.__font = pygame.font.Font(None, 32)
-        self.__small_font = pygame.font.Font(None, 24)
+        self.__title_font = get_font(None, 48)
+        self.__font = get_font(None, 32)
+        self.__small_font = get_font(None, 24)
         
         self.__start_button = Button(412, 650, 200, 60, 'Start Level', (200, 70, 70), (255, 100, 80))
         self.__back_button = Button(20, 20, 120, 50, 'Menu', (70, 70, 70), (100, 100, 100))
@@ -122,6 +189,21 @@ class GarageScreen:
         self.scroll_speed = 20
         self.confirmation_active = False
         self.confirmation_upgrade = None
+        
+        self.__upgrade_area = pygame.Rect(1024 - 300, 100, 250, 500)
+        # Voorgerenderde upgrade lijst, alleen opnieuw opgebouwd als een rij er anders uitziet
+        self.__list_surface = None
+        self.__list_key = None
+        self.__rows = {}  # (upgrade, status, kan betalen, hover) -> 230x60 surface
+        self.__preview = (None, None)  # (auto image, geschaald naar 500x500)
+        
+        # Voor dirty-rect rendering: laatst getekende waardes per regio
+        self.__shown = {}
+        self.__full_redraw = True
+    
+    def invalidate(self):
+        """Redraw the whole screen on the next render_dirty"""
+        self.__full_redraw = True
     
     def update(self, mouse_pos):
         self.__start_button.update(mouse_pos)
@@ -159,31 +241,107 @@ class GarageScreen:
                 return 'back_to_menu'
             
             # Check upgrade clicks
-            upgrade_area = pygame.Rect(1024 - 300, 100, 250, 500)
-            y_offset = 0
-            for upgrade in upgrades:
-                item_rect = pygame.Rect(upgrade_area.x + 10, upgrade_area.y + 10 + y_offset + self.scroll_y, 230, 60)
-                if item_rect.collidepoint(mouse_pos):
-                    # Left click: buy (if not purchased) or equip (if purchased but not equipped)
-                    if mouse_pressed[0]:
-                        if not upgrade.purchased:
-                            # Kopen
-                            if state.money >= upgrade.price:
-                                self.confirmation_active = True
-                                self.confirmation_upgrade = upgrade
-                        elif not upgrade.equipped:
-                            # Al gekocht maar niet equipped - direct equippen
-                            player.apply_upgrade(upgrade)
-                    # Right click: unequip upgrade (if equipped) OR reset all if default
-                    elif mouse_pressed[2]:
-                        if upgrade.equipped:
-                            if "default" in upgrade.name.lower() or "defauld" in upgrade.name.lower():
-                                player.reset_all_upgrades()
-                            else:
-                                player.remove_upgrade(upgrade)
-                y_offset += 70
+            index = self.__hovered_upgrade(mouse_pos, upgrades)
+            if index is not None:
+                upgrade = upgrades[index]
+                # Left click: buy (if not purchased) or equip (if purchased but not equipped)
+                if mouse_pressed[0]:
+                    if not upgrade.purchased:
+                        # Kopen
+                        if state.money >= upgrade.price:
+                            self.confirmation_active = True
+                            self.confirmation_upgrade = upgrade
+                    elif not upgrade.equipped:
+                        # Al gekocht maar niet equipped - direct equippen
+                        player.apply_upgrade(upgrade)
+                # Right click: unequip upgrade (if equipped) OR reset all if default
+                elif mouse_pressed[2]:
+                    if upgrade.equipped:
+                        if "default" in upgrade.name.lower() or "defauld" in upgrade.name.lower():
+                            player.reset_all_upgrades()
+                        else:
+                            player.remove_upgrade(upgrade)
         return None
     
+    def __row_key(self, upgrade, state):
+        if upgrade.equipped:
+            status = 'equipped'
+        elif upgrade.purchased:
+            status = 'owned'
+        else:
+            status = 'shop'
+        return (upgrade, status, status == 'shop' and state.money >= upgrade.price)
+    
+    def __render_row(self, key, hovered=False):
+        upgrade, status, affordable = key
+        row = pygame.Surface((230, 60))
+        # Bepaal kleur gebaseerd op status
+        if status == 'equipped':
+            color = (50, 100, 50)  # Groen voor equipped upgrades
+        elif status == 'owned':
+            color = (60, 60, 80)  # Blauw-grijs voor owned upgrades
+        else:
+            color = (120, 120, 120) if hovered else (80, 80, 80)
+        row.fill(color)
+        
+        # Upgrade icon
+        try:
+            icon = upgrade.image_small
+            if status == 'owned':
+                # Maak icon iets donkerder voor owned maar niet equipped
+                icon = icon.copy()
+                icon.fill((150, 150, 150, 180), special_flags=pygame.BLEND_RGBA_MULT)
+            row.blit(icon, (5, 10))
+        except:
+            pass
+        
+        # Upgrade text
+        if status == 'equipped':
+            # Equipped - show as active
+            text = self.__small_font.render(f'{upgrade.name}', True, (100, 255, 100))
+            if "default" in upgrade.name.lower() or "defauld" in upgrade.name.lower():
+                second_text = self.__small_font.render('RIGHT CLICK: RESET', True, (200, 100, 50))
+            else:
+                second_text = self.__small_font.render('EQUIPPED (R-CLICK)', True, (50, 200, 50))
+        elif status == 'owned':
+            # Purchased but not equipped - show as owned
+            text = self.__small_font.render(f'{upgrade.name}', True, (150, 150, 150))
+            second_text = self.__small_font.render('OWNED (CLICK)', True, (100, 100, 200))
+        else:
+            text_color = (255, 255, 255) if affordable else (150, 150, 150)
+            text = self.__small_font.render(f'{upgrade.name}', True, text_color)
+            second_text = self.__small_font.render(f'${upgrade.price}', True, text_color)
+        row.blit(text, (90, 10))
+        row.blit(second_text, (90, 35))
+        return row
+    
+    def __row(self, key, hovered=False):
+        row = self.__rows.get(key + (hovered, ))
+        if row is None:
+            row = self.__render_row(key, hovered)
+            self.__rows[key + (hovered, )] = row
+        return row
+    
+    def __upgrade_list(self, upgrades, state):
+        """Tall surface with every upgrade row, rebuilt only when a row changes"""
+        keys = tuple(self.__row_key(upgrade, state) for upgrade in upgrades)
+        if keys != self.__list_key:
+            # Alleen rijen bewaren die nog bestaan, zodat de cache niet blijft groeien
+            old_rows = self.__rows
+            self.__rows = {row_key: row for row_key, row in old_rows.items() if row_key[:3] in keys}
+            surface = pygame.Surface((230, 10 + 70 * len(keys)), pygame.SRCALPHA)
+            for i, key in enumerate(keys):
+                surface.blit(self.__row(key), (0, 10 + 70 * i))
+            self.__list_surface = surface
+            self.__list_key = keys
+        return self.__list_surface
+    
+    def __car_preview(self, player):
+        image = player._Player__base_image
+        if self.__preview[0] is not image:
+            self.__preview = (image, pygame.transform.scale(image, (500, 500)))
+        return self.__preview[1]
+    
     def render(self, srf, player, state, upgrades):
         # Background
         if self.__background:
@@ -208,74 +366,26 @@ class GarageScreen:
         
         # Car preview
         try:
-            car_img = pygame.transform.scale(player._Player__base_image, (500, 500))
+            car_img = self.__car_preview(player)
             car_rect = car_img.get_rect(center=(300, 400))
             srf.blit(car_img, car_rect)
         except:
             pass
         
-        # Upgrades menu
-        upgrade_area = pygame.Rect(1024 - 300, 100, 250, 500)
+        # Upgrades menu: 1 blit van het zichtbare stuk van de voorgerenderde lijst
+        upgrade_area = self.__upgrade_area
         pygame.draw.rect(srf, (50, 50, 50), upgrade_area)
+        list_surface = self.__upgrade_list(upgrades, state)
+        srf.blit(list_surface, (upgrade_area.x + 10, upgrade_area.y), (0, -self.scroll_y, 230, upgrade_area.height))
+        hovered = self.__hovered_upgrade(pygame.mouse.get_pos(), upgrades)
+        if hovered is not None and self.__list_key[hovered][1] == 'shop':
+            # De hover kleur is de enige rij die over de lijst getekend wordt
+            row_rect = pygame.Rect(upgrade_area.x + 10, upgrade_area.y + 10 + hovered * 70 + self.scroll_y, 230, 60)
+            visible = row_rect.clip(upgrade_area)
+            srf.blit(self.__row(self.__list_key[hovered], True), visible.topleft,
+                     (visible.x - row_rect.x, visible.y - row_rect.y, visible.width, visible.height))
         pygame.draw.rect(srf, (255, 255, 255), upgrade_area, 2)
         
-        y_offset = 0
-        for upgrade in upgrades:
-            item_rect = pygame.Rect(upgrade_area.x + 10, upgrade_area.y + 10 + y_offset + self.scroll_y, 230, 60)
-            
-            # Only draw if visible
-            if item_rect.bottom > upgrade_area.top and item_rect.top < upgrade_area.bottom:
-                # Bepaal kleur gebaseerd op status
-                if upgrade.equipped:
-                    color = (50, 100, 50)  # Groen voor equipped upgrades
-                elif upgrade.purchased:
-                    color = (60, 60, 80)  # Blauw-grijs voor owned upgrades
-                else:
-                    color = (80, 80, 80)
-                    if item_rect.collidepoint(pygame.mouse.get_pos()):
-                        color = (120, 120, 120)
-                pygame.draw.rect(srf, color, item_rect)
-                
-                # Upgrade icon
-                try:
-                    icon = upgrade.image_small.copy()
-                    if upgrade.equipped:
-                        # Normaal voor equipped upgrades
-                        pass
-                    elif upgrade.purchased:
-                        # Maak icon iets donkerder voor owned maar niet equipped
-                        icon.fill((150, 150, 150, 180), special_flags=pygame.BLEND_RGBA_MULT)
-                    srf.blit(icon, (item_rect.x + 5, item_rect.y + 10))
-                except:
-                    pass
-                
-                # Upgrade text
-                if upgrade.equipped:
-                    # Equipped - show as active
-                    text_color = (100, 255, 100)
-                    text = self.__small_font.render(f'{upgrade.name}', True, text_color)
-                    srf.blit(text, (item_rect.x + 90, item_rect.y + 10))
-                    if "default" in upgrade.name.lower() or "defauld" in upgrade.name.lower():
-                        owned_text = self.__small_font.render('RIGHT CLICK: RESET', True, (200, 100, 50))
-                    else:
-                        owned_text = self.__small_font.render('EQUIPPED (R-CLICK)', True, (50, 200, 50))
-                    srf.blit(owned_text, (item_rect.x + 90, item_rect.y + 35))
-                elif upgrade.purchased:
-                    # Purchased but not equipped - show as owned
-                    text_color = (150, 150, 150)
-                    text = self.__small_font.render(f'{upgrade.name}', True, text_color)
-                    srf.blit(text, (item_rect.x + 90, item_rect.y + 10))
-                    owned_text = self.__small_font.render('OWNED (CLICK)', True, (100, 100, 200))
-                    srf.blit(owned_text, (item_rect.x + 90, item_rect.y + 35))
-                else:
-                    text_color = (255, 255, 255) if state.money >= upgrade.price else (150, 150, 150)
-                    text = self.__small_font.render(f'{upgrade.name}', True, text_color)
-                    srf.blit(text, (item_rect.x + 90, item_rect.y + 10))
-                    price_text = self.__small_font.render(f'${upgrade.price}', True, text_color)
-                    srf.blit(price_text, (item_rect.x + 90, item_rect.y + 35))
-            
-            y_offset += 70
-        
         # Start button
         self.__start_button.render(srf)
         
@@ -303,24 +413,86 @@ class GarageScreen:
             pygame.draw.rect(srf, no_color, btn_no, border_radius=5)
             no_text = self.__small_font.render('No', True, (255, 255, 255))
             srf.blit(no_text, (btn_no.centerx - no_text.get_width()//2, btn_no.centery - no_text.get_height()//2))
+    
+    def __hovered_upgrade(self, mouse_pos, upgrades):
+        """Index of the upgrade row under the mouse, or None"""
+        upgrade_area = self.__upgrade_area
+        if not upgrade_area.collidepoint(mouse_pos) or not upgrade_area.x + 10 <= mouse_pos[0] < upgrade_area.x + 240:
+            return None
+        # Rijen van 60 hoog om de 70 pixels, gewoon uitrekenen in plaats van alle rijen af te lopen
+        i, offset = divmod(mouse_pos[1] - upgrade_area.y - 10 - self.scroll_y, 70)
+        if 0 <= i < len(upgrades) and offset < 60:
+            return i
+        return None
+    
+    def render_dirty(self, srf, player, state, upgrades):
+        """Only redraw what changed, returns the changed rects for pygame.display.update"""
+        mouse_pos = pygame.mouse.get_pos()
+        popup_rect = pygame.Rect(1024//2 - 150, 768//2 - 120, 300, 240)
+        btn_yes = pygame.Rect(popup_rect.x + 30, popup_rect.y + 180, 100, 40)
+        btn_no = pygame.Rect(popup_rect.x + 170, popup_rect.y + 180, 100, 40)
+        
+        # Per regio: (rect, de waardes die bepalen hoe die regio eruit ziet)
+        regions = {
+            'screen': ((0, 0, 1024, 768), (self.confirmation_active, self.confirmation_upgrade, id(player._Player__base_image))),
+            'stats': ((50, 80, 400, 70), (state.money, state.level)),
+            'upgrades': (self.__upgrade_area, (self.scroll_y, tuple(self.__row_key(u, state) for u in upgrades), self.__hovered_upgrade(mouse_pos, upgrades))),
+            'popup': (popup_rect, (btn_yes.collidepoint(mouse_pos), btn_no.collidepoint(mouse_pos))),
+        }
+        changed = [name for name, (rect, shown) in regions.items() if self.__shown.get(name) != shown]
+        for name, (rect, shown) in regions.items():
+            self.__shown[name] = shown
+        dirty = [self.__start_button.dirty_rect(), self.__back_button.dirty_rect()]
+        
+        if self.__full_redraw or 'screen' in changed:
+            self.__full_redraw = False
+            clear_surface(srf)
+            self.render(srf, player, state, upgrades)
+            return [srf.get_rect()]
+        
+        rects = [rect for rect in dirty if rect]
+        rects += [pygame.Rect(regions[name][0]) for name in changed]
+        redraw_regions(srf, rects, lambda: self.render(srf, player, state, upgrades))
+        return rects
 
 class State:
-    def __init__(self, level=1):
-        self.__background = Background('images/Background-image.png')
+    def __init__(self, level=1, zombies=None, seed=None):
+        """`zombies` is the ZombieHorde of the previous level, its slots are reused.
+
+        The zombies of a level only depend on (seed, level); without a seed a random one is picked.
+        """
+        self.__background = level_background()
         self.terrain = Terrain()
+        self.seed = seed if seed is not None else random.randrange(2**31)
+        self.zombies = zombies if zombies is not None else ZombieHorde()
+        self.money = START_MONEY
+        self.reset(level)
+
+    def reset(self, level, seed=None):
+        """Start `level` in place: background, terrain tiles and zombie storage are reused.
+
+        The money stays; without a seed the current one is kept.
+        """
         self.level = level
-        self.zombies = spawn_zombies(level)
-        self.money = 500
+        if seed is not None:
+            self.seed = seed
+        # Terug naar het begin, chunks ver van de start worden opgeruimd
+        self.terrain.set_camera(0)
+        self.zombies.reset()
+        # Zombies worden pas gemaakt als de auto in de buurt komt
+        self.spawner = ZombieSpawner(level, self.seed, self.zombies)
 
     def get_ground_height(self, x):
         return self.terrain.get_ground_height(x)
 
-    def render(self, srf, cam_x):
-        self.__background.render(srf)
-        self.terrain.draw_ground(srf, cam_x)
-        # Draw zombies
-        for zombie in self.zombies:
-            zombie.draw(srf, cam_x, self.terrain)
+    def render(self, srf, cam_x, profiler=NULL_PROFILER):
+        with profiler.section('background'):
+            self.__background.render(srf, cam_x)
+        with profiler.section('terrain'):
+            self.terrain.draw_ground(srf, cam_x)
+        # Draw zombies, alleen die in beeld
+        with profiler.section('zombies.draw'):
+            self.zombies.draw(srf, cam_x, self.terrain)
 
 def create_main_surface():
     screen_size = (1024, 768)
@@ -330,141 +502,339 @@ def create_main_surface():
 def clear_surface(srf):
     srf.fill((0,0,0))
 
-def render_frame(srf, state, player):
-    clear_surface(srf)
-    state.render(srf, player.world_x)
-    player.render(srf, state)
-    player.draw_health_bar(srf)
-    player.draw_fuel_bar(srf)
-    
-    # Display distance, money, and fuel
-    font = pygame.font.Font(None, 36)
-    small_font = pygame.font.Font(None, 28)
-    
-    # Distance and money top right
-    text = font.render(f'Distance: {int(player.world_x)}  Money: ${state.money}', True, (255, 255, 255))
-    text_rect = text.get_rect(topright=(1024 - 10, 10))
-    srf.blit(text, text_rect)
+def update_gameplay(state, player, keys, profiler=NULL_PROFILER):
+    """One fixed simulation step of the playing state.
+
+    Returns 'level_complete', 'game_over' or None.
+    """
+    with profiler.section('player.update'):
+        player.update(state, keys)
+    state.terrain.set_camera(player.world_x)
     
-    # Fuel percentage top right below distance
-    fuel_text = small_font.render(f'Fuel: {int(player.fuel)}%', True, (255, 255, 255))
-    fuel_rect = fuel_text.get_rect(topright=(1024 - 10, 50))
-    srf.blit(fuel_text, fuel_rect)
+    # Update zombies en check collisions, alleen die rond de camera
+    with profiler.section('zombies.update'):
+        state.spawner.update(player.world_x)
+        state.money += state.zombies.update(player, state.terrain)
     
-    pygame.display.flip()
+    # Check game over condities
+    if player.world_x >= 10000:
+        return 'level_complete'
+    elif not player.is_alive() or player.fuel <= 0:
+        return 'game_over'
+    return None
+
+def start_next_level(state, player):
+    """Level complete: reset state and player in place for the next level, keep money (+ health bonus) and upgrades.
+
+    Returns the same (state, player).
+    """
+    state.money += player.health * 5  # Keep money + bonus
+    state.reset(state.level + 1)
+    player.reset(keep_upgrades=True)
+    player.initialize_position(state)
+    return state, player
+
+def render_frame(srf, state, player, hud, alpha=1.0, profiler=NULL_PROFILER):
+    clear_surface(srf)
+    state.render(srf, player.camera_x(alpha), profiler)
+    with profiler.section('player.render'):
+        player.render(srf, state, alpha)
+    with profiler.section('hud'):
+        hud.render(srf, player, state)
+    profiler.render(srf)
+    with profiler.section('flip'):
+        pygame.display.flip()
+
+class Game:
+    """Alles wat de hele sessie blijft leven: scherm, loader, hud, upgrades, state en player.
+
+    De scenes delen dit object; niets hiervan wordt bij een scene overgang opnieuw gemaakt.
+    """
+
+    def __init__(self, srf, loader, dirty_rects=False, uncapped=False, record=None):
+        self.srf = srf
+        self.loader = loader
+        self.dirty_rects = dirty_rects
+        self.uncapped = uncapped
+        self.hud = Hud()
+        # De simulatie loopt altijd in vaste stappen van 1/60 s, los van de render fps
+        self.timestep = FixedTimestep(1 / 60)
+        self.frame_stats = FrameStats()
+        self.profiler = FrameProfiler()
+        self.recorder = Recorder() if record else None
+        self.current_level = 1
+        # Worden gemaakt als hun assets er zijn, zie new_run() en de scenes
+        self.upgrades = None
+        self.state = None
+        self.player = None
+        self.__scenes = {}
+
+    def scene(self, cls):
+        """The one instance of a scene class, made the first time it is needed"""
+        scene = self.__scenes.get(cls)
+        if scene is None:
+            scene = self.__scenes[cls] = cls(self)
+        return scene
+
+    def new_run(self):
+        """First level, nothing bought; the first time this also loads the upgrades and makes state and player"""
+        self.current_level = 1
+        if self.state is None:
+            self.upgrades = UpgradeCatalog()
+            self.state = State(self.current_level)
+            self.player = Player(os.path.join('images', 'truck', 'first-car-concept.png'))
+        else:
+            self.upgrades.reset()
+            self.state.reset(self.current_level, seed=random.randrange(2**31))
+            self.state.money = START_MONEY
+            self.player.reset(keep_upgrades=False)
+        self.player.initialize_position(self.state)  # Initiële positie
 
-def main():
+    def present(self, screen, *args):
+        """Draw a menu screen, only the changed regions in dirty-rect mode"""
+        if self.dirty_rects:
+            pygame.display.update(screen.render_dirty(self.srf, *args))
+        else:
+            clear_surface(self.srf)
+            screen.render(self.srf, *args)
+            pygame.display.flip()
+
+class StartScene(Scene):
+    name = 'start_screen'
+
+    def __init__(self, game):
+        self.__game = game
+        self.__screen = StartScreen()
+
+    def enter(self, previous):
+        self.__screen.invalidate()
+
+    def redraw(self):
+        self.__screen.invalidate()
+
+    def frame(self, manager, mouse_pos, mouse_pressed):
+        game = self.__game
+        # Ook als de loader net klaar is, anders blijft de balk op de laatste waarde staan
+        self.__screen.set_progress(game.loader.progress())
+        self.__screen.update(mouse_pos)
+        action = self.__screen.handle_click(mouse_pos, mouse_pressed)
+
+        if action == 'start_game':
+            # Staat als eerste in de rij, dus meestal al klaar
+            game.loader.wait('garage')
+            if game.state is None:
+                game.new_run()
+            manager.push(game.scene(GarageScene))
+        elif action == 'quit':
+            manager.quit()
+        elif action == 'credits':
+            game.loader.wait('credits')
+            manager.push(game.scene(CreditsScene))
+        elif action == 'settings':
+            # Voeg settings functionaliteit toe
+            pass
+
+        game.present(self.__screen)
+
+class GarageScene(Scene):
+    name = 'garage'
+
+    def __init__(self, game):
+        self.__game = game
+        self.__screen = GarageScreen()
+        self.__refresh_in = 0
+
+    def enter(self, previous):
+        # Upgrades opnieuw inlezen gebeurt in frame(), zo doet de overgang zelf geen schijf I/O
+        self.__refresh_in = 0
+        self.__screen.invalidate()
+
+    def __refresh_upgrades(self):
+        # Nieuwe of aangepaste upgrade mappen oppikken, leest alleen wat veranderd is
+        self.__refresh_in -= 1
+        if self.__refresh_in > 0:
+            return
+        self.__refresh_in = UPGRADE_REFRESH_FRAMES
+        game = self.__game
+        if game.upgrades.refresh():
+            game.player.replace_upgrades(game.upgrades.replaced)
+            self.__screen.invalidate()
+
+    def redraw(self):
+        self.__screen.invalidate()
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEWHEEL:
+            self.__screen.handle_scroll(event.y, len(self.__game.upgrades))
+
+    def frame(self, manager, mouse_pos, mouse_pressed):
+        game = self.__game
+        self.__refresh_upgrades()
+        self.__screen.update(mouse_pos)
+        action = self.__screen.handle_click(mouse_pos, mouse_pressed, game.player, game.state, game.upgrades)
+
+        if action == 'start_level':
+            game.loader.wait('playing')
+            manager.push(game.scene(PlayingScene))
+        elif action == 'back_to_menu':
+            manager.pop()
+
+        game.present(self.__screen, game.player, game.state, game.upgrades)
+        # Ondertussen de rotaties van de auto al klaarzetten voor het level
+        game.player.prewarm_rotations(limit=8)
+
+class CreditsScene(Scene):
+    name = 'credits'
+
+    def __init__(self, game):
+        self.__game = game
+        self.__screen = CreditsScreen()
+
+    def enter(self, previous):
+        self.__screen.invalidate()
+
+    def redraw(self):
+        self.__screen.invalidate()
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEWHEEL:
+            self.__screen.handle_scroll(event.y)
+
+    def frame(self, manager, mouse_pos, mouse_pressed):
+        self.__screen.update(mouse_pos)
+        if self.__screen.handle_click(mouse_pos, mouse_pressed) == 'back_to_menu':
+            manager.pop()
+        self.__game.present(self.__screen)
+
+class PlayingScene(Scene):
+    name = 'playing'
+
+    def __init__(self, game):
+        self.__game = game
+        self.__outcome = None
+        self.uncapped = game.uncapped
+
+    def enter(self, previous):
+        game = self.__game
+        self.__outcome = None
+        # Tijd in de menus telt niet mee voor de simulatie en de profiler
+        game.timestep.reset()
+        game.frame_stats.reset()
+        game.profiler.reset_frame()
+        # Wat de garage nog niet klaargezet heeft; zo wordt er geen mask in de frame loop gemaakt
+        game.player.prewarm_rotations()
+        game.state.zombies.prewarm()
+        if game.recorder is not None:
+            game.recorder.start_level(game.state, game.player)
+
+    def exit(self, next_scene):
+        # Het volgende level klaarzetten hoort bij de overgang, zodat die mee gemeten wordt
+        game = self.__game
+        game.profiler.reset_frame()
+        if self.__outcome == 'level_complete':
+            # Level complete - ga naar garage
+            game.current_level += 1
+            game.state, game.player = start_next_level(game.state, game.player)
+        elif self.__outcome == 'game_over':
+            # Game over - Terug naar startscherm
+            game.new_run()
+
+    def handle_event(self, event):
+        profiler = self.__game.profiler
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            profiler.toggle()
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+            path = time.strftime('profile-%Y%m%d-%H%M%S.csv')
+            frames = profiler.dump_csv(path)
+            print(f'Profiler: {frames} frames written to {path}')
+
+    def frame(self, manager, mouse_pos, mouse_pressed):
+        game = self.__game
+        state, player, recorder, profiler = game.state, game.player, game.recorder, game.profiler
+        keys = pygame.key.get_pressed()
+        outcome = None
+        steps = game.timestep.advance()
+        for _ in range(steps):
+            if recorder is not None:
+                recorder.record(keys)
+            outcome = update_gameplay(state, player, keys, profiler)
+            if outcome:
+                break
+
+        render_frame(game.srf, state, player, game.hud, game.timestep.alpha(), profiler)
+        game.frame_stats.record(steps)
+        profiler.end_frame()
+        if outcome and recorder is not None:
+            recorder.end_level(outcome, state, player)
+
+        self.__outcome = outcome
+        if outcome == 'level_complete':
+            manager.pop()  # Terug naar de garage
+        elif outcome == 'game_over':
+            manager.pop(2)  # Terug naar het startscherm
+
+def main(dirty_rects=False, uncapped=False, record=None):
+    """Start the game.
+
+    With dirty_rects the menus only redraw and update the regions that changed.
+    With uncapped the playing state renders as fast as it can; the simulation
+    still runs at a fixed 60 steps per second.
+    While playing, F3 toggles the frame profiler and F4 dumps its samples to a CSV file.
+    With record the seeds and keys of every level are saved to that file on exit,
+    to replay with headless.py --replay.
+    The start screen is shown as soon as its own images are decoded; the rest is
+    decoded on a thread pool and the other screens are made when they are first needed.
+    """
     pygame.init()
     # Maakt scherm
     srf = create_main_surface()
+    loader = AssetLoader(asset_groups())
+    loader.wait('start')
     # Clock voor fps vast te zetten - anders gaat spel te snel
     clock = pygame.time.Clock()
-    
-    # Game states
-    current_state = 'start_screen'  # 'start_screen', 'garage', 'credits', of 'playing'
-    start_screen = StartScreen()
-    garage_screen = GarageScreen()
-    credits_screen = CreditsScreen()
-    upgrades = load_upgrades()
-    current_level = 1
-    state = State(current_level)
-    player = Player(os.path.join('images', 'truck', 'first-car-concept.png'))
-    player.initialize_position(state)  # Initiële positie 
+    game = Game(srf, loader, dirty_rects, uncapped, record)
+    scenes = SceneManager(game.scene(StartScene))
     
     # Gameloop
-    while True:
+    while scenes.running:
+        if not loader.done():
+            loader.poll()
+        
         mouse_pos = pygame.mouse.get_pos()
         mouse_pressed = pygame.mouse.get_pressed()
         
-        for event in pygame.event.get():
+        # Alleen het level wordt geprofiled, end_frame() zit in PlayingScene
+        profiler = game.profiler if isinstance(scenes.current, PlayingScene) else NULL_PROFILER
+        with profiler.section('events'):
+            events = pygame.event.get()
+        for event in events:
             if event.type == pygame.QUIT:
-                pygame.quit()
-                return
-            elif event.type == pygame.MOUSEWHEEL and current_state == 'garage':
-                garage_screen.handle_scroll(event.y, len(upgrades))
-            elif event.type == pygame.MOUSEWHEEL and current_state == 'credits':
-                credits_screen.handle_scroll(event.y)
+                scenes.quit()
+            elif event.type == pygame.WINDOWEXPOSED:
+                scenes.current.redraw()
+            else:
+                scenes.handle_event(event)
         
-        if current_state == 'start_screen':
-            start_screen.update(mouse_pos)
-            action = start_screen.handle_click(mouse_pos, mouse_pressed)
-            
-            if action == 'start_game':
-                current_state = 'garage'
-            elif action == 'quit':
-                pygame.quit()
-                return
-            elif action == 'credits':
-                current_state = 'credits'
-            elif action == 'settings':
-                # Voeg settings functionaliteit toe
-                pass
-            
-            clear_surface(srf)
-            start_screen.render(srf)
-            pygame.display.flip()
+        scenes.frame(mouse_pos, mouse_pressed)
         
-        elif current_state == 'garage':
-            garage_screen.update(mouse_pos)
-            action = garage_screen.handle_click(mouse_pos, mouse_pressed, player, state, upgrades)
-            
-            if action == 'start_level':
-                current_state = 'playing'
-            elif action == 'back_to_menu':
-                current_state = 'start_screen'
-            
-            clear_surface(srf)
-            garage_screen.render(srf, player, state, upgrades)
-            pygame.display.flip()
-        
-        elif current_state == 'credits':
-            credits_screen.update(mouse_pos)
-            action = credits_screen.handle_click(mouse_pos, mouse_pressed)
-            
-            if action == 'back_to_menu':
-                current_state = 'start_screen'
-            
-            clear_surface(srf)
-            credits_screen.render(srf)
-            pygame.display.flip()
-            
-        elif current_state == 'playing':
-            keys = pygame.key.get_pressed()
-            player.update(state, keys)
-            
-            # Update zombies en check collisions
-            for zombie in state.zombies:
-                money_earned = zombie.update(player, state.terrain)
-                state.money += money_earned
-            
-            render_frame(srf, state, player)
-            
-            # Check game over condities
-            if player.world_x >= 10000:
-                # Level complete - ga naar garage
-                current_level += 1
-                current_state = 'garage'
-                old_money = state.money
-                old_upgrades = player.purchased_upgrades.copy()  # Save upgrades
-                state = State(current_level)
-                state.money = old_money + (player.health * 5)  # Keep money + bonus
-                player = Player('images/truck/first-car-concept.png')
-                player.purchased_upgrades = old_upgrades  # Restore upgrades
-                player.update_combined_image()  # Apply upgrades to image
-                # Reapply upgrade stats
-                for upgrade in old_upgrades:
-                    player.damage_reduction += upgrade.damage_reduction
-                    player.speed_multiplier += upgrade.speed_increase
-                player.initialize_position(state)
-            elif not player.is_alive() or player.fuel <= 0:
-                # Game over - Terug naar startscherm
-                current_state = 'start_screen'
-                current_level = 1
-                upgrades = load_upgrades()  # Reset upgrades
-                state = State(current_level)
-                player = Player('images/truck/first-car-concept.png')
-                player.initialize_position(state)
-        
-        clock.tick(60)  # 60 FPS
-        
-main()
+        if scenes.current.uncapped:
+            clock.tick()  # Geen limiet, de simulatie blijft toch op 60 stappen per seconde
+        else:
+            clock.tick(60)  # 60 FPS
+    
+    loader.shutdown()
+    print(game.frame_stats.summary_text())
+    print(scenes.summary_text())
+    if game.recorder is not None:
+        game.recorder.end_level(None, game.state, game.player)
+        game.recorder.save(record)
+        print(f'Recorded {len(game.recorder.segments)} level(s) to {record}')
+    pygame.quit()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Drive to Survive')
+    parser.add_argument('--dirty-rects', action='store_true', help='menus only redraw the regions that changed')
+    parser.add_argument('--uncapped', action='store_true', help='render gameplay as fast as possible (simulation stays at 60 steps/s)')
+    parser.add_argument('--record', metavar='FILE', help='record seeds and keys to FILE, replay with headless.py --replay')
+    args = parser.parse_args()
+    main(dirty_rects=args.dirty_rects, uncapped=args.uncapped, record=args.record)
@@ -1,44 +1,182 @@
 import pygame
 import math
+from collections import OrderedDict
+from assets import load_image
+
+
+class RotationCache:
+    """LRU cache van geroteerde versies van 1 base image, plus hun collision masks.
+
+    De hoek wordt gekwantiseerd (standaard op 0.5 graden) zodat kleine
+    schommelingen van de hoek dezelfde surface teruggeven. De masks staan
+    apart, op mask_step graden, voor de volle 360 graden: in de lucht kan de
+    auto elke hoek hebben, en een mask mag nooit in de frame loop gemaakt
+    worden. Ze worden niet geëvict (720 masks van ~10 KB).
+    """
+
+    def __init__(self, step=0.5, max_size=96, mask_step=0.5):
+        self.step = step
+        self.max_size = max_size
+        self.mask_step = mask_step
+        self.hits = 0
+        self.misses = 0
+        self.mask_misses = 0  # Masks die toch pas bij een botsing gemaakt werden
+        self.__image = None
+        self.__rotations = OrderedDict()
+        self.__masks = {}
+        self.__mask_image = None  # 8-bit zwart/wit versie van de base image, roteert ~4x sneller
+
+    def set_image(self, image):
+        """Swap the base image; cached rotations and masks of the old image are dropped"""
+        if image is not self.__image:
+            self.__image = image
+            self.__rotations.clear()
+            self.__masks.clear()
+            self.__mask_image = None
+
+    def __key(self, angle):
+        steps = int(round(360 / self.step))
+        return int(round(angle / self.step)) % steps
+
+    def get(self, angle):
+        """Return the base image rotated by the quantized angle"""
+        key = self.__key(angle)
+        rotated = self.__rotations.get(key)
+        if rotated is not None:
+            self.hits += 1
+            self.__rotations.move_to_end(key)
+            return rotated
+        self.misses += 1
+        return self.__store(key)
+
+    def __store(self, key):
+        rotated = pygame.transform.rotate(self.__image, key * self.step)
+        self.__rotations[key] = rotated
+        if len(self.__rotations) > self.max_size:
+            self.__rotations.popitem(last=False)
+        return rotated
+
+    def get_mask(self, angle):
+        """Return the collision mask of the base image rotated by angle, quantized to mask_step"""
+        steps = int(round(360 / self.mask_step))
+        key = int(round(angle / self.mask_step)) % steps
+        mask = self.__masks.get(key)
+        if mask is None:
+            # Gebeurt alleen als er gespeeld wordt voor prewarm_masks() klaar is
+            self.mask_misses += 1
+            mask = self.__store_mask(key)
+        return mask
+
+    def __store_mask(self, key):
+        if self.__mask_image is None:
+            # Gezette pixels wit, de rest zwart als colorkey: dezelfde mask als van de geroteerde image zelf
+            mask_image = pygame.Surface(self.__image.get_size(), 0, 8)
+            mask_image.set_palette([(0, 0, 0), (255, 255, 255)] + [(0, 0, 0)] * 254)
+            pygame.mask.from_surface(self.__image).to_surface(mask_image, setcolor=(255, 255, 255),
+                                                              unsetcolor=(0, 0, 0))
+            mask_image.set_colorkey((0, 0, 0))
+            self.__mask_image = mask_image
+        mask = pygame.mask.from_surface(pygame.transform.rotate(self.__mask_image, key * self.mask_step))
+        self.__masks[key] = mask
+        return mask
+
+    def prewarm(self, angles, limit=None):
+        """Rotate angles that are not cached yet, at most `limit` of them. Returns how many were added"""
+        added = 0
+        for angle in angles:
+            if limit is not None and added >= limit:
+                break
+            key = self.__key(angle)
+            if key not in self.__rotations:
+                self.__store(key)
+                added += 1
+        return added
+
+    def prewarm_masks(self, limit=None):
+        """Build the missing masks of the full circle, at most `limit` of them. Returns how many were added"""
+        steps = int(round(360 / self.mask_step))
+        added = 0
+        for i in range(steps):
+            if len(self.__masks) == steps or (limit is not None and added >= limit):
+                break
+            # 0, 1, -1, 2, -2, ...: de hoeken rond vlak eerst
+            key = (i + 1) // 2 * (1 if i % 2 else -1) % steps
+            if key not in self.__masks:
+                self.__store_mask(key)
+                added += 1
+        return added
+
+    def masks_complete(self):
+        return len(self.__masks) == int(round(360 / self.mask_step))
+
+    def __len__(self):
+        return len(self.__rotations)
+
 
 class Player: 
     def __init__(self, image):
         self.x = 1024 // 3  # Positie van de speler (op 1/3 van het scherm)
-        self.world_x = 200  # Positie in de wereld
-        self.speed = 0
-        self.vspeed = 0
-        self.angle = 0
-        self.air_angle = None
-        self.health = 100  # Player health
         self.max_health = 100  # Maximum health
-        self.fuel = 100  # Fuel level
         self.max_fuel = 100  # Maximum fuel
         self.base_speed = 0.12  # Base acceleration
         self.damage_reduction = 0  # Damage reduction from upgrades
         self.speed_multiplier = 1.0  # Speed multiplier from upgrades
-        self.FUEL_CONSUMPTION_RATE = 0.1 # verandert hoeveel brandstof we per seconden verbruiken
-        self.last_fuel_tick = pygame.time.get_ticks() # houd bij wanneer de laatste keer brandstof is afgegaan
+        self.FUEL_CONSUMPTION_RATE = 0.1 # verandert hoeveel brandstof we per simulatiestap (1/60 s) verbruiken
         self.GRAVITY = 0.095
         self.FRICTION = 0.99
         self.AIR_FRICTION = 0.995
-        self.__original_image_path = image  # Store path to reload fresh
+        self.SLOPE_ANGLE_RANGE = 15  # Het terrein is nooit steiler dan ~12 graden
+        self.__rotations = RotationCache()
         self.__create_image(image)
-        self.__base_car_image = self.__base_image.copy()  # Store original
+        self.__base_car_image = self.__base_image  # De auto zonder upgrades, wordt nooit aangepast
         self.purchased_upgrades = []  # Store purchased upgrade objects
+        self.equipped_upgrades = []  # Gekochte upgrades die nu aan staan, in de volgorde waarin ze aangezet zijn
         self.rect = self.__base_image.get_rect()
-        self.y = 0  # Wordt goedgezet na dat State is aangemaakt
+        self.reset()
+
+    def reset(self, keep_upgrades=True):
+        """Back to the start of a level with full health and fuel.
+
+        The images and the rotation cache are kept; without keep_upgrades the
+        upgrades of this run are forgotten too.
+        """
+        self.world_x = 200  # Positie in de wereld
+        self.speed = 0
+        self.vspeed = 0
+        self.angle = 0
+        self.air_angle = None
+        self.health = self.max_health  # Player health
+        self.fuel = self.max_fuel  # Fuel level
+        if not keep_upgrades and self.purchased_upgrades:
+            for upgrade in self.equipped_upgrades:
+                upgrade.equipped = False
+            self.purchased_upgrades.clear()
+            self.equipped_upgrades.clear()
+            self.recompute_stats()
+            self.update_combined_image()
+        self.y = 0  # Wordt goedgezet door initialize_position
+        # Toestand van de vorige simulatiestap, om tussen 2 stappen te interpoleren bij het renderen
+        self.prev_world_x = self.world_x
+        self.prev_y = self.y
+        self.prev_angle = self.angle
 
     def __create_image(self, image):
         # Laad de auto en zet het op 200 bij 200 pixels
-        self.__base_image = pygame.image.load(image)
-        self.__base_image = pygame.transform.scale(self.__base_image, (200, 200))
+        self.__base_image = load_image(image, (200, 200))
         self.__image = self.__base_image
+        self.__rotations.set_image(self.__base_image)
     
     def initialize_position(self, state):
         """Call this after state is created to set initial ground position"""
         self.y = state.get_ground_height(int(self.world_x)) - self.rect.height
+        self.prev_y = self.y
 
     def update(self, state, keys):
+        """Advance the car by one fixed simulation step"""
+        self.prev_world_x = self.world_x
+        self.prev_y = self.y
+        self.prev_angle = self.angle
+        
         # Fuel-based acceleration
         if keys[pygame.K_RIGHT] and self.fuel > 0:
             self.speed += self.base_speed * self.speed_multiplier
@@ -86,20 +224,51 @@ class Player:
         # Update de hitbox voor botsing te detecteren - centreer horizontaal
         self.rect.topleft = (self.x - self.rect.width//2, self.y)
 
-    #update het brandstof niveau elke seconde dat de auto rijd
+    #update het brandstof niveau elke simulatiestap dat de auto rijdt
     def update_fuel(self): 
-        now = pygame.time.get_ticks()
-        if now - self.last_fuel_tick >= 10:
-            self.fuel -= self.FUEL_CONSUMPTION_RATE
-            self.fuel = max(self.fuel, 0)
-            self.last_fuel_tick = now
-
-    def render(self, srf, state):
-        # Draai de auto gebaseerd op de angle
-        rotated_image = pygame.transform.rotate(self.__base_image, self.angle)
-        rotated_rect = rotated_image.get_rect(center=self.rect.center)
+        self.fuel -= self.FUEL_CONSUMPTION_RATE
+        self.fuel = max(self.fuel, 0)
+
+    def camera_x(self, alpha=1.0):
+        """World x of the camera, interpolated between the last two simulation steps"""
+        return self.prev_world_x + (self.world_x - self.prev_world_x) * alpha
+
+    def render(self, srf, state, alpha=1.0):
+        # Positie en hoek interpoleren tussen de vorige en de huidige simulatiestap
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        angle = self.prev_angle + (self.angle - self.prev_angle) * alpha
+        rect = self.rect.copy()
+        rect.topleft = (self.x - rect.width//2, y)
+        
+        # Draai de auto gebaseerd op de angle (uit de rotatie cache)
+        rotated_image = self.__rotations.get(angle)
+        rotated_rect = rotated_image.get_rect(center=rect.center)
         srf.blit(rotated_image, rotated_rect)
     
+    def collision_mask(self):
+        """Mask of the rotated car and the screen rect it covers, centered on self.rect"""
+        mask = self.__rotations.get_mask(self.angle)
+        return mask, mask.get_rect(center=self.rect.center)
+
+    def prewarm_rotations(self, limit=None):
+        """Pre-rotate the car for the common slope angles, then build the collision masks of every angle.
+
+        At most `limit` images per call; returns True when everything is cached.
+        """
+        step = self.__rotations.step
+        count = int(self.SLOPE_ANGLE_RANGE / step)
+        # Vanaf 0 graden naar buiten, de vlakke hoeken komen het meest voor
+        angles = [0]
+        for i in range(1, count + 1):
+            angles += [i * step, -i * step]
+        added = self.__rotations.prewarm(angles, limit)
+        if limit is not None:
+            limit -= added
+            if limit <= 0:
+                return False
+        self.__rotations.prewarm_masks(limit)
+        return self.__rotations.masks_complete()
+    
     def draw_health_bar(self, srf):
         """Draw health bar on screen"""
         bar_width = 200
@@ -127,33 +296,69 @@ class Player:
         return self.health > 0
     
     def apply_upgrade(self, upgrade):
-        """Apply an upgrade to the player"""
-        # Check if already purchased
-        if upgrade in self.purchased_upgrades:
+        """Buy (if it was not bought yet) and equip an upgrade"""
+        if upgrade not in self.purchased_upgrades:
+            self.purchased_upgrades.append(upgrade)
+        if upgrade in self.equipped_upgrades:
             return
-        
-        self.damage_reduction += upgrade.damage_reduction
-        self.speed_multiplier += upgrade.speed_increase
-        self.purchased_upgrades.append(upgrade)
+        self.equipped_upgrades.append(upgrade)
+        upgrade.equipped = True
+        self.recompute_stats()
         self.update_combined_image()
     
+    def remove_upgrade(self, upgrade):
+        """Unequip an upgrade; it stays bought"""
+        if upgrade not in self.equipped_upgrades:
+            return
+        self.equipped_upgrades.remove(upgrade)
+        upgrade.equipped = False
+        self.recompute_stats()
+        self.update_combined_image()
+    
+    def reset_all_upgrades(self):
+        """Unequip every upgrade, back to the plain car"""
+        for upgrade in self.equipped_upgrades:
+            upgrade.equipped = False
+        self.equipped_upgrades.clear()
+        self.recompute_stats()
+        self.update_combined_image()
+    
+    def replace_upgrades(self, replaced):
+        """Point at reloaded upgrades, {old: new or None}, and take over their stats and image"""
+        if not replaced:
+            return
+        for upgrades in (self.purchased_upgrades, self.equipped_upgrades):
+            upgrades[:] = [replaced.get(upgrade, upgrade) for upgrade in upgrades]
+            # Een map die weg is of niet meer geldig is, is ook voor de player weg
+            upgrades[:] = [upgrade for upgrade in upgrades if upgrade is not None]
+        self.recompute_stats()
+        self.update_combined_image()
+    
+    def recompute_stats(self):
+        """Derive the upgrade stats from the equipped upgrades, in one pass"""
+        damage_reduction = 0
+        speed_multiplier = 1.0
+        for upgrade in self.equipped_upgrades:
+            damage_reduction += upgrade.damage_reduction
+            speed_multiplier += upgrade.speed_increase
+        self.damage_reduction = damage_reduction
+        self.speed_multiplier = speed_multiplier
+    
     def update_combined_image(self):
-        """Use the latest upgrade image as the car image"""
-        if self.purchased_upgrades:
-            # Gebruik de laatst gekochte upgrade als de auto image
-            latest_upgrade = self.purchased_upgrades[-1]
-            
-            # Check if this is the ramp upgrade and scale it differently
-            if "ramp" in latest_upgrade.name.lower():
-                up_scaled = pygame.transform.scale(latest_upgrade.image, (200, 200))
-            else:
-                up_scaled = pygame.transform.scale(latest_upgrade.image, (200, 200))
-            
-            self.__base_image = up_scaled
-            self.rect = self.__base_image.get_rect()
+        """Use the image of the latest equipped upgrade as the car image"""
+        if self.equipped_upgrades:
+            # Gebruik de laatst aangezette upgrade als de auto image
+            image = self.equipped_upgrades[-1].image
+            if image.get_size() != (200, 200):
+                image = pygame.transform.scale(image, (200, 200))
         else:
             # Als er geen upgrades zijn, gebruik de originele auto
-            self.__create_image(self.__original_image_path)
+            image = self.__base_car_image
+        # Dezelfde surface als vorige keer houdt de rotatie cache en de garage preview geldig
+        self.__base_image = image
+        self.__image = image
+        self.__rotations.set_image(image)
+        self.rect = image.get_rect()
     
     def draw_fuel_bar(self, srf):
         """Draw fuel bar on screen"""
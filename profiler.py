@@ -0,0 +1,159 @@
+import csv
+import math
+import time
+import pygame
+from collections import deque
+from fonts import get_font
+
+
+class _Section:
+    """Context manager die de tijd van 1 fase optelt bij het huidige frame"""
+
+    def __init__(self, profiler, name):
+        self.__profiler = profiler
+        self.__name = name
+        self.__start = 0.0
+
+    def __enter__(self):
+        self.__start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.__profiler.add(self.__name, (time.perf_counter() - self.__start) * 1000)
+        return False
+
+
+class _NoSection:
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SECTION = _NoSection()
+
+
+class FrameProfiler:
+    """Meet per frame hoe lang elke fase van de main loop duurt.
+
+    Gebruik `with profiler.section('naam'):` rond een fase en end_frame() na de
+    flip. Staat de profiler uit, dan kost section() bijna niets.
+    """
+
+    def __init__(self, window=300, history=36000):
+        self.enabled = False
+        self.BUDGET_MS = 1000 / 60
+        self.phases = []  # Namen in de volgorde waarin ze voor het eerst gemeten zijn
+        self.__window = deque(maxlen=window)  # Laatste frames voor de overlay: (frame_ms, {fase: ms})
+        self.__history = deque(maxlen=history)  # Alles voor de CSV dump
+        self.__current = {}
+        self.__frame_start = None
+        self.__frame_no = 0
+        self.__font = None
+        self.__panel = None
+        self.__panel_age = 0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.reset_frame()
+        return self.enabled
+
+    def reset_frame(self):
+        """Forget the frame in progress; call when the profiled scene starts or stops"""
+        # Anders telt de eerste frame erna alle tijd in de menus mee
+        self.__current = {}
+        self.__frame_start = None
+
+    def section(self, name):
+        if not self.enabled:
+            return _NO_SECTION
+        return _Section(self, name)
+
+    def add(self, name, ms):
+        if name not in self.__current and name not in self.phases:
+            self.phases.append(name)
+        self.__current[name] = self.__current.get(name, 0.0) + ms
+
+    def end_frame(self):
+        """Close the current frame; the frame time is the time since the previous end_frame"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.__frame_start is not None:
+            frame_ms = (now - self.__frame_start) * 1000
+            sample = (frame_ms, self.__current)
+            self.__window.append(sample)
+            self.__history.append((self.__frame_no, ) + sample)
+            self.__frame_no += 1
+        self.__current = {}
+        self.__frame_start = now
+
+    def stats(self):
+        """Rolling average and p99 in ms per phase (and for the whole frame) over the window"""
+        result = {}
+        for name in ['frame'] + self.phases:
+            if name == 'frame':
+                values = [frame_ms for frame_ms, phases in self.__window]
+            else:
+                values = [phases.get(name, 0.0) for frame_ms, phases in self.__window]
+            if not values:
+                continue
+            ordered = sorted(values)
+            result[name] = {
+                'avg_ms': sum(values) / len(values),
+                'p99_ms': ordered[min(len(ordered) - 1, math.ceil(len(ordered) * 0.99) - 1)],
+            }
+        return result
+
+    def dump_csv(self, path):
+        """Write every recorded frame: frame number, frame time and the time of each phase in ms"""
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame', 'frame_ms'] + [f'{name}_ms' for name in self.phases])
+            for frame_no, frame_ms, phases in self.__history:
+                writer.writerow([frame_no, f'{frame_ms:.4f}'] + [f'{phases.get(name, 0.0):.4f}' for name in self.phases])
+        return len(self.__history)
+
+    def __build_panel(self):
+        if self.__font is None:
+            self.__font = get_font(None, 20)
+        stats = self.stats()
+        rows = list(stats.items())
+        graph_height = 60
+        panel = pygame.Surface((340, 30 + 18 * len(rows) + graph_height + 10), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        columns = (8, 190, 265)  # x van de kolommen: fase, avg, p99
+        for x, text in zip(columns, ('phase', 'avg ms', 'p99 ms')):
+            panel.blit(self.__font.render(text, True, (255, 255, 0)), (x, 8))
+        for i, (name, values) in enumerate(rows):
+            over = values['p99_ms'] > self.BUDGET_MS
+            color = (255, 120, 120) if over else (255, 255, 255)
+            for x, text in zip(columns, (name, f'{values["avg_ms"]:.2f}', f'{values["p99_ms"]:.2f}')):
+                panel.blit(self.__font.render(text, True, color), (x, 28 + 18 * i))
+
+        # Frametijd grafiek van de laatste frames, met een lijn op het 60 fps budget
+        graph = pygame.Rect(8, panel.get_height() - graph_height - 8, panel.get_width() - 16, graph_height)
+        pygame.draw.rect(panel, (40, 40, 40, 200), graph)
+        scale = graph_height / (2 * self.BUDGET_MS)
+        frames = list(self.__window)[-graph.width:]
+        for i, (frame_ms, phases) in enumerate(frames):
+            height = min(graph_height, int(frame_ms * scale))
+            color = (255, 80, 80) if frame_ms > self.BUDGET_MS else (80, 220, 80)
+            pygame.draw.line(panel, color, (graph.x + i, graph.bottom - 1), (graph.x + i, graph.bottom - height))
+        budget_y = graph.bottom - int(self.BUDGET_MS * scale)
+        pygame.draw.line(panel, (255, 255, 0), (graph.x, budget_y), (graph.right - 1, budget_y))
+        return panel
+
+    def render(self, srf, pos=(10, 120)):
+        """Draw the overlay; the panel is rebuilt a few times per second, not every frame"""
+        if not self.enabled:
+            return
+        self.__panel_age += 1
+        if self.__panel is None or self.__panel_age >= 10:
+            self.__panel = self.__build_panel()
+            self.__panel_age = 0
+        srf.blit(self.__panel, pos)
+
+
+# Staat altijd uit, als default voor functies die optioneel geprofiled worden
+NULL_PROFILER = FrameProfiler()
@@ -0,0 +1,130 @@
+"""Opnemen en afspelen van een sessie, om zware runs exact te herhalen.
+
+Een opname bevat per level de seed van State, het geld en de upgrades bij de
+start, en per simulatiestap welke toetsen ingedrukt waren. De toetsen worden
+als bitmask run-length encoded: [[aantal stappen, mask], ...].
+
+Opnemen: python main.py --record run.json
+Afspelen: python headless.py --replay run.json [--render]
+"""
+import json
+import pygame
+
+# 2: `upgrades` van een segment zijn de equipped upgrades (1: alles wat gekocht was)
+FORMAT_VERSION = 2
+
+# De toetsen die de simulatie leest, bit i van het mask is RECORDED_KEYS[i]
+RECORDED_KEYS = (pygame.K_RIGHT, pygame.K_LEFT, pygame.K_UP, pygame.K_DOWN, pygame.K_SPACE)
+
+
+def keys_to_mask(keys):
+    mask = 0
+    for bit, key in enumerate(RECORDED_KEYS):
+        if keys[key]:
+            mask |= 1 << bit
+    return mask
+
+
+class RecordedKeys:
+    """Stands in for pygame.key.get_pressed() during a replay"""
+
+    def __init__(self, mask):
+        self.mask = mask
+
+    def __getitem__(self, key):
+        try:
+            return bool(self.mask >> RECORDED_KEYS.index(key) & 1)
+        except ValueError:
+            return False
+
+
+class Segment:
+    """The simulation steps of one level, from entering it until the outcome"""
+
+    def __init__(self, level, seed, money, upgrades, keys=None, result=None):
+        self.level = level
+        self.seed = seed
+        self.money = money
+        self.upgrades = list(upgrades)  # Namen van de equipped upgrades, in de volgorde waarin ze aangezet zijn
+        self.keys = keys if keys is not None else []  # [[aantal stappen, mask], ...]
+        self.result = result  # Outcome, geld, afstand en health aan het einde van de opname
+
+    @property
+    def frames(self):
+        return sum(count for count, mask in self.keys)
+
+    def record(self, mask):
+        if self.keys and self.keys[-1][1] == mask:
+            self.keys[-1][0] += 1
+        else:
+            self.keys.append([1, mask])
+
+    def key_frames(self):
+        """Yield a RecordedKeys for every recorded simulation step"""
+        for count, mask in self.keys:
+            keys = RecordedKeys(mask)
+            for _ in range(count):
+                yield keys
+
+    def to_dict(self):
+        return {'level': self.level, 'seed': self.seed, 'money': self.money,
+                'upgrades': self.upgrades, 'keys': self.keys, 'result': self.result}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['level'], data['seed'], data['money'], data.get('upgrades', []),
+                   [[int(count), int(mask)] for count, mask in data['keys']], data.get('result'))
+
+
+def segment_result(outcome, state, player):
+    return {'outcome': outcome, 'money': state.money, 'distance': player.world_x, 'health': player.health}
+
+
+class Recorder:
+    """Records a session while it is played; save() writes it as JSON"""
+
+    def __init__(self):
+        self.segments = []
+        self.__current = None
+
+    def start_level(self, state, player):
+        """Call when the level starts, after the garage, so bought upgrades are included"""
+        if self.__current is not None:
+            self.end_level(None, state, player)
+        self.__current = Segment(state.level, state.seed, state.money,
+                                 [upgrade.name for upgrade in player.equipped_upgrades])
+        self.segments.append(self.__current)
+
+    def record(self, keys):
+        """Call once per simulation step with the keys that step used"""
+        if self.__current is not None:
+            self.__current.record(keys_to_mask(keys))
+
+    def end_level(self, outcome, state, player):
+        if self.__current is not None:
+            self.__current.result = segment_result(outcome, state, player)
+            self.__current = None
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump({'version': FORMAT_VERSION, 'segments': [s.to_dict() for s in self.segments]}, f,
+                      separators=(',', ':'))
+
+
+class Recording:
+    """A saved session, see Recorder"""
+
+    def __init__(self, segments):
+        self.segments = segments
+
+    @property
+    def frames(self):
+        return sum(segment.frames for segment in self.segments)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if data.get('version') != FORMAT_VERSION:
+            raise ValueError(f'{path}: unsupported recording version {data.get("version")!r}')
+        return cls([Segment.from_dict(segment) for segment in data['segments']])
@@ -0,0 +1,93 @@
+"""Scene stack voor de main loop.
+
+Elke scene is een lang levend object dat zijn eigen schermen en surfaces
+bijhoudt; van scene wisselen maakt niets opnieuw aan. Een scene vraagt een
+overgang aan via de manager (push, pop, quit) en die wordt pas na het frame
+uitgevoerd. Elke overgang wordt gemeten: hoe lang exit() + enter() duurden
+en hoeveel images daarbij van schijf gedecodeerd werden (hoort 0 te zijn).
+"""
+import time
+from assets import io_stats
+
+
+class Scene:
+    """Base class for a scene; every hook is optional"""
+
+    name = 'scene'
+    uncapped = False  # True: de main loop beperkt de fps niet zolang deze scene bovenaan staat
+
+    def enter(self, previous):
+        """The scene is now on top of the stack; `previous` was on top before (or None)"""
+
+    def exit(self, next_scene):
+        """Another scene comes on top, or this one is popped"""
+
+    def handle_event(self, event):
+        pass
+
+    def redraw(self):
+        """The window lost its contents (WINDOWEXPOSED), draw everything on the next frame"""
+
+    def frame(self, manager, mouse_pos, mouse_pressed):
+        """Update and draw one frame"""
+
+
+class SceneManager:
+    """Stack of scenes; the top one gets the events and frames"""
+
+    def __init__(self, scene):
+        self.stack = []
+        self.running = True
+        self.transitions = []  # (van, naar, ms, disk decodes)
+        self.__pending = None
+        self.__switch([scene])
+
+    @property
+    def current(self):
+        return self.stack[-1] if self.stack else None
+
+    def push(self, scene):
+        self.__pending = self.stack + [scene]
+
+    def pop(self, count=1):
+        """Go back `count` scenes; the bottom scene always stays"""
+        self.__pending = self.stack[:max(1, len(self.stack) - count)]
+
+    def quit(self):
+        self.running = False
+
+    def handle_event(self, event):
+        self.current.handle_event(event)
+
+    def frame(self, mouse_pos, mouse_pressed):
+        """Run the top scene for one frame, then apply the transition it asked for"""
+        self.current.frame(self, mouse_pos, mouse_pressed)
+        if self.__pending is not None:
+            stack, self.__pending = self.__pending, None
+            self.__switch(stack)
+
+    def __switch(self, stack):
+        previous = self.current
+        scene = stack[-1]
+        if scene is previous:
+            self.stack = stack
+            return
+        start = time.perf_counter()
+        decodes = io_stats['disk_decodes']
+        if previous is not None:
+            previous.exit(scene)
+        self.stack = stack
+        scene.enter(previous)
+        ms = (time.perf_counter() - start) * 1000
+        self.transitions.append((previous.name if previous else None, scene.name, ms,
+                                 io_stats['disk_decodes'] - decodes))
+
+    def summary_text(self):
+        # De eerste "overgang" is het tonen van de eerste scene
+        measured = self.transitions[1:]
+        if not measured:
+            return 'Scene transitions: none'
+        slowest = max(measured, key=lambda t: t[2])
+        return (f"Scene transitions: {len(measured)}, mean {sum(t[2] for t in measured) / len(measured):.2f} ms, "
+                f"max {slowest[2]:.2f} ms ({slowest[0]} -> {slowest[1]}), "
+                f"{sum(t[3] for t in measured)} images decoded from disk")
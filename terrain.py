@@ -1,23 +1,122 @@
 import pygame
 import math
+import numpy as np
 
 class Terrain:
     def __init__(self):
-        self.terrain_points = {}
         self.TERRAIN_STEP = 10
+        self.CHUNK_WIDTH = 1024  # Aantal hoogtes (1 per pixel) per chunk
+        self.CHUNKS_BEHIND = 1  # Chunks achter de camera die bewaard blijven
+        self.CHUNKS_AHEAD = 3  # Chunks voor de camera die gecached mogen worden
         self.GROUND_COLOR = (110, 85, 55)
         self.GROUND_DARK_COLOR = (80, 60, 40)
+        self.TILE_TOP = 768 - 200  # Het terrein komt nooit hoger dan deze y
+        self.__chunks = {}  # chunk index -> float32 array met CHUNK_WIDTH + 1 hoogtes
+        self.__cam_chunk = 0
+        self.__tiles = {}  # chunk index -> voorgerenderde grond surface
+        self.__free_tiles = []  # Tiles die uit beeld zijn, klaar om hergebruikt te worden
 
     def generate_height(self, x):
+        """Height at x; works on a single number or on a NumPy array of x values"""
         base = 768 - 140
-        return base + math.sin(x * 0.006) * 20 + math.sin(x * 0.02) * 5
-    
+        return base + np.sin(x * 0.006) * 20 + np.sin(x * 0.02) * 5
+
+    def __build_chunk(self, index):
+        # 1 hoogte extra zodat interpolatie op de rand van de chunk niet in de volgende chunk moet kijken
+        start = index * self.CHUNK_WIDTH
+        xs = np.arange(start, start + self.CHUNK_WIDTH + 1, dtype=np.float64)
+        return self.generate_height(xs).astype(np.float32)
+
+    def __get_chunk(self, index):
+        heights = self.__chunks.get(index)
+        if heights is None:
+            # Alleen chunks rond de camera cachen, de rest wordt direct berekend
+            if not (self.__cam_chunk - self.CHUNKS_BEHIND <= index <= self.__cam_chunk + self.CHUNKS_AHEAD):
+                return None
+            heights = self.__build_chunk(index)
+            self.__chunks[index] = heights
+        return heights
+
+    def set_camera(self, cam_x):
+        """Move the cache window to cam_x and evict chunks that fell out of it"""
+        cam_chunk = int(math.floor(cam_x)) // self.CHUNK_WIDTH
+        if cam_chunk == self.__cam_chunk:
+            return
+        self.__cam_chunk = cam_chunk
+        for index in list(self.__chunks):
+            if not (cam_chunk - self.CHUNKS_BEHIND <= index <= cam_chunk + self.CHUNKS_AHEAD):
+                del self.__chunks[index]
+
+    def cached_chunks(self):
+        return len(self.__chunks)
+
     def get_ground_height(self, x):
-        if x not in self.terrain_points:
-            self.terrain_points[x] = self.generate_height(x)
-        return self.terrain_points[x]
-    
+        x0 = math.floor(x)
+        index, i = divmod(x0, self.CHUNK_WIDTH)
+        heights = self.__get_chunk(index)
+        if heights is not None:
+            h0 = float(heights[i])
+            h1 = float(heights[i + 1])
+        else:
+            # Zelfde float32 afronding als in de chunks, zodat het antwoord niet afhangt van de cache
+            h0 = float(np.float32(self.generate_height(x0)))
+            h1 = float(np.float32(self.generate_height(x0 + 1)))
+        frac = x - x0
+        if frac:
+            return h0 + (h1 - h0) * frac
+        return h0
+
+    def get_ground_heights(self, xs):
+        """Vectorized get_ground_height for a NumPy array of x values, same answers"""
+        x0 = np.floor(xs)
+        h0 = self.generate_height(x0).astype(np.float32).astype(np.float64)
+        h1 = self.generate_height(x0 + 1).astype(np.float32).astype(np.float64)
+        return h0 + (h1 - h0) * (xs - x0)
+
+    def __render_tile(self, index):
+        if self.__free_tiles:
+            tile = self.__free_tiles.pop()
+            tile.fill((0, 0, 0, 0))
+        else:
+            tile = pygame.Surface((self.CHUNK_WIDTH, 768 - self.TILE_TOP), pygame.SRCALPHA)
+            if pygame.display.get_surface() is not None:
+                tile = tile.convert_alpha()
+        # Punten op een vast wereld-raster, 1 stap over de randen heen, zodat de tiles naadloos aansluiten
+        start = index * self.CHUNK_WIDTH
+        first_x = (start // self.TERRAIN_STEP - 1) * self.TERRAIN_STEP
+        xs = np.arange(first_x, start + self.CHUNK_WIDTH + 2 * self.TERRAIN_STEP, self.TERRAIN_STEP)
+        ys = self.generate_height(xs).astype(np.float32) - self.TILE_TOP
+        pts = list(zip((xs - start).tolist(), ys.tolist()))
+        bottom = tile.get_height()
+        polygon = pts + [(pts[-1][0], bottom), (pts[0][0], bottom)]
+        pygame.draw.polygon(tile, self.GROUND_COLOR, polygon)
+        pygame.draw.lines(tile, self.GROUND_DARK_COLOR, False, pts, 3)
+        # RLE maakt het blitten van de (grotendeels doorzichtige) tile een stuk goedkoper
+        tile.set_alpha(255, pygame.RLEACCEL)
+        return tile
+
     def draw_ground(self, srf, cam_x):
+        """Blit the pre-rendered tiles that overlap the screen"""
+        self.set_camera(cam_x)
+        left = cam_x - 1024//3  # Wereld x van de linkerkant van het scherm
+        first = int(math.floor(left)) // self.CHUNK_WIDTH
+        last = int(math.floor(left + 1024 - 1)) // self.CHUNK_WIDTH
+
+        # Tiles die uit beeld zijn gaan terug naar de free list
+        for index in list(self.__tiles):
+            if index < first or index > last:
+                self.__free_tiles.append(self.__tiles.pop(index))
+
+        for index in range(first, last + 1):
+            tile = self.__tiles.get(index)
+            if tile is None:
+                tile = self.__render_tile(index)
+                self.__tiles[index] = tile
+            srf.blit(tile, (round(index * self.CHUNK_WIDTH - left), self.TILE_TOP))
+
+    def draw_ground_polygon(self, srf, cam_x):
+        """Old per-frame polygon path, only kept to compare against in benchmark.py"""
+        self.set_camera(cam_x)
         pts = []
         start = int(cam_x) - 400
         for x in range(start, start + 1024 + 800, self.TERRAIN_STEP):
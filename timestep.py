@@ -0,0 +1,87 @@
+import time
+import math
+import statistics
+from collections import deque
+
+
+class FixedTimestep:
+    """Accumulator voor een vaste simulatiestap.
+
+    De simulatie loopt altijd in stappen van `step` seconden, hoe snel er ook
+    gerenderd wordt. alpha() zegt hoe ver we tussen de vorige en de huidige
+    stap zitten, zodat de render kan interpoleren.
+    """
+
+    def __init__(self, step=1 / 60, max_steps=5):
+        self.step = step
+        self.max_steps = max_steps  # Niet eindeloos inhalen als een frame heel traag was
+        self.accumulator = 0.0
+        self.__last_time = None
+
+    def reset(self):
+        """Forget the time spent outside the simulation (menus, loading)"""
+        self.accumulator = 0.0
+        self.__last_time = None
+
+    def advance(self):
+        """Add the time since the last call, return how many fixed steps to simulate now"""
+        now = time.perf_counter()
+        if self.__last_time is None:
+            # Eerste frame: 1 stap zodat er meteen iets gebeurt
+            self.__last_time = now
+            return 1
+        frame_time = min(now - self.__last_time, self.step * self.max_steps)
+        self.__last_time = now
+        self.accumulator += frame_time
+        steps = int(self.accumulator // self.step)
+        self.accumulator -= steps * self.step
+        return steps
+
+    def alpha(self):
+        """Fraction of a step between the previous and the current simulation state"""
+        return min(self.accumulator / self.step, 1.0)
+
+
+class FrameStats:
+    """Frame pacing statistieken over de laatste `window` frames"""
+
+    def __init__(self, window=600):
+        self.__frame_times = deque(maxlen=window)  # in ms
+        self.__steps = deque(maxlen=window)
+        self.__last_time = None
+
+    def reset(self):
+        self.__frame_times.clear()
+        self.__steps.clear()
+        self.__last_time = None
+
+    def record(self, steps):
+        """Call once per rendered frame with the number of simulation steps in that frame"""
+        now = time.perf_counter()
+        if self.__last_time is not None:
+            self.__frame_times.append((now - self.__last_time) * 1000)
+            self.__steps.append(steps)
+        self.__last_time = now
+
+    def summary(self):
+        times = sorted(self.__frame_times)
+        if len(times) < 2:
+            return None
+        mean = statistics.fmean(times)
+        return {
+            'frames': len(times),
+            'fps': 1000 / mean,
+            'mean_ms': mean,
+            'p99_ms': times[min(len(times) - 1, math.ceil(len(times) * 0.99) - 1)],
+            'max_ms': times[-1],
+            'jitter_ms': statistics.pstdev(times),  # Standaardafwijking van de frametijd
+            'steps_per_frame': statistics.fmean(self.__steps),
+        }
+
+    def summary_text(self):
+        s = self.summary()
+        if s is None:
+            return 'Frame stats: not enough frames'
+        return (f"Frame stats: {s['frames']} frames, {s['fps']:.1f} fps, mean {s['mean_ms']:.2f} ms, "
+                f"p99 {s['p99_ms']:.2f} ms, max {s['max_ms']:.2f} ms, jitter {s['jitter_ms']:.2f} ms, "
+                f"{s['steps_per_frame']:.2f} sim steps/frame")
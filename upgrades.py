@@ -1,31 +1,156 @@
 import pygame
 import os
 import json
+from assets import load_images, forget_file
+
+# Veld -> (toegelaten types, default); velden zonder default zijn verplicht
+INFO_SCHEMA = {
+    "name": ((str,), None),
+    "description": ((str,), ""),
+    "car_damage": ((int, float), 0),
+    "damage_reduction": ((int, float), 0),
+    "speed_increase": ((int, float), 0),
+    "price": ((int,), 50),
+    "author": ((str,), ""),
+    "version": ((str,), ""),
+    "dependencies": ((list,), []),
+}
+
+
+def parse_info(info_file):
+    """Read and validate an upgrade info.json; raises ValueError with the file name if it is invalid"""
+    with open(info_file, "r") as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{info_file}: invalid JSON: {e}") from e
+    if not isinstance(data, dict):
+        raise ValueError(f"{info_file}: expected an object")
+    info = {}
+    for field, (types, default) in INFO_SCHEMA.items():
+        if field not in data:
+            if default is None:
+                raise ValueError(f"{info_file}: missing required field '{field}'")
+            info[field] = default
+            continue
+        value = data[field]
+        # bool is ook een int in Python, maar geen geldige prijs of schade
+        if isinstance(value, bool) or not isinstance(value, types):
+            raise ValueError(f"{info_file}: '{field}' must be {' or '.join(t.__name__ for t in types)}")
+        info[field] = value
+    if not info["name"]:
+        raise ValueError(f"{info_file}: 'name' is empty")
+    if info["price"] < 0:
+        raise ValueError(f"{info_file}: 'price' is negative")
+    return info
+
 
 class Upgrade:
     def __init__(self, folder):
         info_file = os.path.join(folder, "info.json")
-        with open(info_file, "r") as f:
-            data = json.load(f)
-        self.name = data.get("name")
-        self.car_damage = data.get("car_damage", 0)
-        self.damage_reduction = data.get("damage_reduction", 0)
-        self.speed_increase = data.get("speed_increase", 0)
-        self.price = data.get("price", 50)
+        data = parse_info(info_file)
+        self.name = data["name"]
+        self.car_damage = data["car_damage"]
+        self.damage_reduction = data["damage_reduction"]
+        self.speed_increase = data["speed_increase"]
+        self.price = data["price"]
         img_file = os.path.join(folder, "image.png")
-        self.image = pygame.image.load(img_file).convert_alpha()
-        self.image_small = pygame.transform.scale(self.image, (80, 40))
+        # Al op de grootte van de auto en van het icoon in de garage, uit de atlas als die er is;
+        # anders wordt de image 1 keer gedecodeerd voor beide groottes
+        self.image, self.image_small = load_images(img_file, [(200, 200), (80, 40)])
         self.purchased = False
         self.equipped = False
 
+    def reset(self):
+        """Forget what was bought in this run"""
+        self.purchased = False
+        self.equipped = False
+
+
+class UpgradeCatalog:
+    """Alle upgrades uit de upgrades map, 1 keer ingelezen en daarna hergebruikt.
+
+    refresh() kijkt naar de mtimes van de bestanden in elke map en leest alleen
+    nieuwe of veranderde mappen opnieuw in, dus een nieuwe upgrade verschijnt
+    zonder de game te herstarten. Gedraagt zich als een lijst van Upgrades.
+    """
+
+    def __init__(self, folder="upgrades"):
+        self.folder = folder
+        self.upgrades = []
+        self.reloads = 0  # Aantal keer dat een map (opnieuw) ingelezen is
+        self.replaced = {}  # Bij de laatste refresh(): oude Upgrade -> nieuwe, of None als de map weg of ongeldig is
+        self.__entries = {}  # map naam -> (signature, Upgrade of None als de map ongeldig is)
+        self.refresh()
+
+    def __signature(self, path):
+        try:
+            return tuple(sorted((entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+                                for entry in os.scandir(path) if entry.is_file()))
+        except OSError:
+            return None
+
+    def refresh(self):
+        """Re-read new or changed upgrade folders, drop removed ones. Returns True if anything changed.
+
+        The Upgrades that were replaced or dropped are in `replaced`, see Player.replace_upgrades.
+        """
+        if not os.path.exists(self.folder):
+            names = []
+        else:
+            names = sorted(name for name in os.listdir(self.folder)
+                           if os.path.isdir(os.path.join(self.folder, name)))
+        changed = set(self.__entries) != set(names)
+        entries = {}
+        self.replaced = {old[1]: None for name, old in self.__entries.items()
+                         if name not in names and old[1] is not None}
+        for name in names:
+            path = os.path.join(self.folder, name)
+            signature = self.__signature(path)
+            old = self.__entries.get(name)
+            if old is not None and old[0] == signature:
+                entries[name] = old
+                continue
+            changed = True
+            self.reloads += 1
+            if old is not None:
+                # Anders komt de oude image terug uit de atlas of de al gedecodeerde bestanden
+                forget_file(os.path.join(path, "image.png"))
+            try:
+                upgrade = Upgrade(path)
+            except (OSError, ValueError, pygame.error) as e:
+                # Pas opnieuw proberen als er iets aan de map verandert
+                print(f"Skipping upgrade {path}: {e}")
+                upgrade = None
+            if old is not None and old[1] is not None:
+                # Wat al gekocht was blijft gekocht; de player moet dan naar de nieuwe versie wijzen
+                self.replaced[old[1]] = upgrade
+                if upgrade is not None:
+                    upgrade.purchased = old[1].purchased
+                    upgrade.equipped = old[1].equipped
+            entries[name] = (signature, upgrade)
+        self.__entries = entries
+        self.upgrades = [upgrade for signature, upgrade in entries.values() if upgrade is not None]
+        return changed
+
+    def reset(self):
+        """New run: keep the loaded upgrades, only clear the purchased/equipped flags"""
+        for upgrade in self.upgrades:
+            upgrade.reset()
+
+    def by_name(self):
+        return {upgrade.name: upgrade for upgrade in self.upgrades}
+
+    def __iter__(self):
+        return iter(self.upgrades)
+
+    def __len__(self):
+        return len(self.upgrades)
+
+    def __getitem__(self, index):
+        return self.upgrades[index]
+
+
 def load_upgrades():
     """Load all upgrades from the upgrades folder"""
-    upgrades_list = []
-    upgrades_folder = "upgrades"
-    if not os.path.exists(upgrades_folder):
-        return upgrades_list
-    for folder_name in os.listdir(upgrades_folder):
-        folder_path = os.path.join(upgrades_folder, folder_name)
-        if os.path.isdir(folder_path):
-            upgrades_list.append(Upgrade(folder_path))
-    return upgrades_list
\ No newline at end of file
+    return UpgradeCatalog("upgrades").upgrades
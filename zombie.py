@@ -1,338 +1,380 @@
 import pygame
 import os
-import re
 import random
+import numpy as np
+from assets import animation_cache
 
 
-def load_animation(folder, base_name):
-    """Helper: load base and numbered frames robustly (handles ' - Copy' suffixes).
+class ZombieType:
+    """Alles wat zombies van dezelfde soort delen: animaties, health, schade en beloning.
 
-    Returns list of pygame Surfaces ordered: base (index 0) then numbered frames.
+    De frames komen pas uit de gedeelde cache als ze voor het eerst nodig zijn,
+    dan is er zeker al een display voor convert_alpha.
     """
-    frames = []
-    if not os.path.exists(folder):
-        print(f"Warning: Folder not found: {folder}")
-        return frames
-
-    exts = ["png", "gif", "jpg", "jpeg"]
-    exts_pattern = "|".join(exts)
-    pattern = re.compile(rf'^{re.escape(base_name)}(?: \((\d+)\))?.*\.({exts_pattern})$', re.IGNORECASE)
-
-    candidates = []
-    for fname in os.listdir(folder):
-        m = pattern.match(fname)
-        if m:
-            idx = int(m.group(1)) if m.group(1) else 0
-            candidates.append((idx, os.path.join(folder, fname)))
-
-    candidates.sort(key=lambda t: (t[0], t[1]))
-
-    def _safe_load(path):
-        try:
-            img = pygame.image.load(path)
-            try:
-                img = img.convert_alpha()
-            except Exception:
-                img = img.convert()
-            img = pygame.transform.scale(img, (110, 100))
-            return img
-        except Exception as e:
-            print(f"Error loading {path}: {e}")
-            return None
-
-    for idx, path in candidates:
-        img = _safe_load(path)
-        if img is not None:
-            frames.append(img)
-
-    print(f"Loaded {len(frames)} frames from {folder}")
-    return frames
-
-class Zombie:
-    def __init__(self, x):
-        self.x = x
-        self.__set_health(1)
-        self.alive = True
-        self.dying = False
-        self.death_timer = 0
-        self.death_duration = 30  # frames for death animation
-
-    def __set_health(self, level):
-        self.__health = 50 * (1.1 ** level)
-        
-        # Load animations using the correct relative paths
-        walk_path = os.path.join("images", "normal-zombie")
-        death_path = os.path.join("images", "normal-zombie-damaged")
-        
-        print(f"Attempting to load walk animation from: {walk_path}")
-        print(f"Path exists: {os.path.exists(walk_path)}")
-        
-        self.walk_frames = self.load_zombie_animation(walk_path, "Zombie1-ezgif.com-crop")
-        self.death_frames = self.load_zombie_animation(death_path, "zombie1Damaged-ezgif.com-crop")
-        
-        if not self.walk_frames:
-            print("ERROR: Could not load walk animation frames!")
-            print(f"Current working directory: {os.getcwd()}")
-            if os.path.exists(walk_path):
-                print(f"Files in {walk_path}:")
-                print(os.listdir(walk_path))
-        
-        self.current_frame = 0
-        self.animation_speed = 0.15
-        self.animation_counter = 0
-        
+
+    def __init__(self, name, walk_folder, walk_base, death_folder, death_base, size=(110, 100), flip=False,
+                 base_health=50, damage=10, money=10, animation_speed=0.15, death_duration=30):
+        self.name = name
+        self.__walk = (walk_folder, walk_base)
+        self.__death = (death_folder, death_base)
+        self.size = size
+        self.flip = flip
+        self.base_health = base_health
+        self.damage = damage
+        self.money = money
+        self.animation_speed = animation_speed
+        self.death_duration = death_duration  # frames for death animation
+        self.__walk_frames = None
+        self.__death_frames = None
+        self.__walk_masks = None
+
+    @property
+    def walk_frames(self):
+        if self.__walk_frames is None:
+            self.__walk_frames = animation_cache.get(*self.__walk, self.size, self.flip)
+        return self.__walk_frames
+
+    @property
+    def death_frames(self):
+        if self.__death_frames is None:
+            self.__death_frames = animation_cache.get(*self.__death, self.size, self.flip)
+        return self.__death_frames
+
+    @property
+    def walk_masks(self):
+        """Collision masks of the walk frames, only walking zombies can be hit"""
+        if self.__walk_masks is None:
+            self.__walk_masks = animation_cache.get_masks(*self.__walk, self.size, self.flip)
+        return self.__walk_masks
+
+    def prewarm(self):
+        """Fetch the frames and masks now instead of the first time a zombie of this type is updated"""
+        return self.walk_frames, self.death_frames, self.walk_masks
+
+    def animations(self):
+        """(folder, base_name, size, flip) of the walk and death animation, for atlas.py"""
+        return [(*self.__walk, self.size, self.flip), (*self.__death, self.size, self.flip)]
+
+    def rect_size(self):
         if self.walk_frames:
-            self.rect = self.walk_frames[0].get_rect()
-        else:
-            self.rect = pygame.Rect(0, 0, 22, 40)
-
-    def load_zombie_animation(self, folder, base_name):
-        """Load animation frames from a folder starting from (1).png upwards"""
-        frames = []
-        
-        if not os.path.exists(folder):
-            print(f"Warning: Folder not found: {folder}")
-            return frames
-        
-        # Load frames starting from (1).png and go up
-        frame_num = 1
-        while True:
-            frame_path = os.path.join(folder, f"{base_name} ({frame_num}).png")
-            
-            if os.path.exists(frame_path):
-                try:
-                    img = pygame.image.load(frame_path).convert_alpha()
-                    img = pygame.transform.scale(img, (90,80))
-                    img = pygame.transform.flip(img, True, False)
-                    frames.append(img)
-                    frame_num += 1
-                except Exception as e:
-
-
-                    print(f"Error loading {frame_path}: {e}")
-                    break
-            else:
-                # No more frames found
-                break
-        
-        print(f"Loaded {len(frames)} frames from {folder}")
-        return frames
+            return self.walk_frames[0].get_size()
+        return (22, 40)
+
+    def health(self, level):
+        #health word per level exponentieel verhoogd met 10%
+        return self.base_health * (1.1 ** level)
+
+
+NORMAL_ZOMBIE = 0
+FAT_ZOMBIE = 1
+ZOMBIE_TYPES = [
+    ZombieType("normal",
+               os.path.join("images", "normal-zombie"), "Zombie1-ezgif.com-crop",
+               os.path.join("images", "normal-zombie-damaged"), "zombie1Damaged-ezgif.com-crop",
+               size=(90, 80), flip=True, base_health=50),
+    # filenames in images/fat-zombie use 'fatzombie3-ezgif.com-crop' (lowercase),
+    # damaged frames are gifs and use 'fatzombieDamaged-ezgif.com-crop'
+    ZombieType("fat",
+               os.path.join("images", "fat-zombie"), "fatzombie3-ezgif.com-crop",
+               os.path.join("images", "fat-zombie-damaged"), "fatzombieDamaged-ezgif.com-crop",
+               base_health=200),
+]
+
+
+class ZombieHorde:
+    """Alle zombies van een level als structure-of-arrays.
+
+    Posities, health, status, animatie en type zitten in NumPy arrays, gesorteerd
+    op x. update() en draw() werken met vector operaties op het stuk van de arrays
+    rond de camera, dus duizenden zombies in een level kosten bijna niets extra.
+
+    De arrays zijn ook een pool: [0, count) zijn actieve zombies, de rest van de
+    capacity zijn vrije slots. Dode zombies worden opgeruimd (de actieve zombies
+    schuiven aaneen, de volgorde blijft), en nieuwe zombies en volgende levels
+    hergebruiken de vrije slots in plaats van nieuwe arrays te maken.
+    """
+
+    ARRAYS = ('x', 'type_id', 'health', 'alive', 'dying', 'death_timer', 'frame', 'anim_counter')
+
+    def __init__(self, capacity=64, types=ZOMBIE_TYPES):
+        self.types = types
+        self.count = 0
+        self.capacity = 0
+        self.__used_slots = 0  # Hoogste aantal slots ooit in gebruik, daaronder is een slot hergebruik
+        self.__sorted = True
+        self.__needs_reclaim = False
+        self.__allocate(capacity)
+        self.__type_tables = None
+        self.__reset_stats()
+
+    def __reset_stats(self):
+        self.killed = 0
+        self.spawned = 0
+        self.reused_slots = 0
+        self.reclaimed = 0
+        self.despawned = 0
+        self.grows = 0
+        self.peak = self.count
+
+    def reset(self):
+        """Empty the horde for a new level; the arrays are kept for reuse"""
+        self.count = 0
+        self.__sorted = True
+        self.__needs_reclaim = False
+        self.__reset_stats()
+
+    def __allocate(self, capacity):
+        old = getattr(self, 'x', None)
+        arrays = {
+            'x': np.float64,
+            'type_id': np.int16,
+            'health': np.float32,
+            'alive': np.bool_,
+            'dying': np.bool_,
+            'death_timer': np.int32,
+            'frame': np.int32,  # current animation frame
+            'anim_counter': np.float32,
+        }
+        for name, dtype in arrays.items():
+            array = np.zeros(capacity, dtype=dtype)
+            if old is not None:
+                array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def __tables(self):
+        # Per type: grootte, aantal frames, ... als arrays zodat we met type_id kunnen indexeren
+        if self.__type_tables is None:
+            sizes = [t.rect_size() for t in self.types]
+            self.__type_tables = {
+                'w': np.array([w for w, h in sizes], dtype=np.int32),
+                'h': np.array([h for w, h in sizes], dtype=np.int32),
+                'walk_frames': np.array([len(t.walk_frames) for t in self.types], dtype=np.int32),
+                'death_frames': np.array([len(t.death_frames) for t in self.types], dtype=np.int32),
+                'animation_speed': np.array([t.animation_speed for t in self.types], dtype=np.float32),
+                'death_duration': np.array([t.death_duration for t in self.types], dtype=np.int32),
+                'damage': np.array([t.damage for t in self.types], dtype=np.int32),
+                'money': np.array([t.money for t in self.types], dtype=np.int32),
+            }
+        return self.__type_tables
+
+    def prewarm(self):
+        """Load every type and build the type tables, so update() and draw() never have to"""
+        for zombie_type in self.types:
+            zombie_type.prewarm()
+        self.__tables()
+
+    def add(self, x, type_id, level=1):
+        if self.count == self.capacity:
+            self.__allocate(self.capacity * 2)
+            self.grows += 1
+        i = self.count
+        if i < self.__used_slots:
+            self.reused_slots += 1
+        self.__used_slots = max(self.__used_slots, i + 1)
+        if i and x < self.x[i - 1]:
+            self.__sorted = False
+        self.x[i] = x
+        self.type_id[i] = type_id
+        self.health[i] = self.types[type_id].health(level)
+        self.alive[i] = True
+        self.dying[i] = False
+        self.death_timer[i] = 0
+        self.frame[i] = 0
+        self.anim_counter[i] = 0
+        self.count += 1
+        self.spawned += 1
+        self.peak = max(self.peak, self.count)
+
+    def __sort(self):
+        order = np.argsort(self.x[:self.count], kind='stable')
+        for name in self.ARRAYS:
+            array = getattr(self, name)
+            array[:self.count] = array[:self.count][order]
+        self.__sorted = True
+
+    def reclaim(self):
+        """Remove dead zombies: the live ones move together, in the same order, freeing slots at the end"""
+        keep = self.alive[:self.count].copy()
+        alive_count = int(keep.sum())
+        if alive_count < self.count:
+            for name in self.ARRAYS:
+                array = getattr(self, name)
+                array[:alive_count] = array[:self.count][keep]
+            self.reclaimed += self.count - alive_count
+            self.count = alive_count
+        self.__needs_reclaim = False
+
+    def despawn_before(self, x):
+        """Remove every zombie left of x (dead or alive), e.g. the ones far behind the car"""
+        if not self.__sorted:
+            self.__sort()
+        behind = int(np.searchsorted(self.x[:self.count], x, 'left'))
+        if behind:
+            remaining = self.count - behind
+            for name in self.ARRAYS:
+                array = getattr(self, name)
+                array[:remaining] = array[behind:self.count].copy()
+            self.despawned += behind
+            self.count = remaining
+
+    def pool_stats(self):
+        """Pool occupancy and reuse since the last reset (i.e. for this level)"""
+        return {
+            'active': self.count,
+            'capacity': self.capacity,
+            'occupancy': self.count / self.capacity if self.capacity else 0.0,
+            'peak': self.peak,
+            'spawned': self.spawned,
+            'killed': self.killed,
+            'reclaimed': self.reclaimed,
+            'despawned': self.despawned,
+            'reused_slots': self.reused_slots,
+            'grows': self.grows,
+        }
+
+    def window(self, cam_x, margin=200):
+        """Index range (lo, hi) of the zombies between the screen edges, plus margin"""
+        if not self.__sorted:
+            self.__sort()
+        xs = self.x[:self.count]
+        lo = int(np.searchsorted(xs, cam_x - 1024//3 - margin, 'left'))
+        hi = int(np.searchsorted(xs, cam_x + 1024 - 1024//3 + margin, 'right'))
+        return lo, hi
+
+    def __screen_rects(self, sl, types, cam_x, terrain, tables):
+        w = tables['w'][types]
+        h = tables['h'][types]
+        # Zelfde afronding als pygame.Rect: naar een int afkappen
+        sx = np.trunc(self.x[sl] - cam_x + 1024//3 - w//2).astype(np.int32)
+        sy = np.trunc(terrain.get_ground_heights(self.x[sl]) - h).astype(np.int32)
+        return sx, sy, w, h
+
+    def __collide(self, car, sl, types, sx, sy, w, h, candidates):
+        # Broad phase: rect tegen de bounding box van de gedraaide auto, voor alle zombies tegelijk
+        car_mask, rect = car.collision_mask()
+        hit = candidates & (sx < rect.right) & (sx + w > rect.left) & (sy < rect.bottom) & (sy + h > rect.top)
+        # Narrow phase: pixel masks, alleen voor de paar zombies die de broad phase overleven
+        frames = self.frame[sl]
+        for i in np.nonzero(hit)[0].tolist():
+            masks = self.types[types[i]].walk_masks
+            if masks and not car_mask.overlap(masks[frames[i]], (int(sx[i]) - rect.x, int(sy[i]) - rect.y)):
+                hit[i] = False
+        return hit
 
     def update(self, car, terrain):
-        """Update zombie and check collision with car. Returns money earned."""
+        """Update the zombies around the car and check collisions with the car. Returns money earned."""
+        lo, hi = self.window(car.world_x)
+        if lo == hi:
+            return 0
+        sl = slice(lo, hi)
+        tables = self.__tables()
+        types = self.type_id[sl]
+        sx, sy, w, h = self.__screen_rects(sl, types, car.world_x, terrain, tables)
+        alive = self.alive[sl]
+        dying = self.dying[sl]
+
+        # Botsing met de auto
+        hit = self.__collide(car, sl, types, sx, sy, w, h, alive & ~dying)
         money_earned = 0
-        
-        if self.alive and not self.dying:
-            if self.rect.colliderect(car.rect):
-                self.dying = True
-                self.death_timer = 0
-                self.current_frame = 0
-                damage = max(0, 10 - car.damage_reduction)
-                car.take_damage(damage)
-                money_earned = 10
-        
-        if self.dying:
-            self.death_timer += 1
-            if self.death_timer >= self.death_duration:
-                self.alive = False
-        
+        if hit.any():
+            dying[hit] = True
+            self.death_timer[sl][hit] = 0
+            self.frame[sl][hit] = 0
+            for type_id in types[hit]:
+                car.take_damage(max(0, int(tables['damage'][type_id]) - car.damage_reduction))
+                money_earned += int(tables['money'][type_id])
+            self.killed += int(hit.sum())
+
+        # Death timer
+        death_timer = self.death_timer[sl]
+        death_timer[dying] += 1
+        died = dying & alive & (death_timer >= tables['death_duration'][types])
+        if died.any():
+            alive[died] = False
+            self.__needs_reclaim = True
+
         # Update animation frame
-        self.animation_counter += self.animation_speed
-        if self.animation_counter >= 1:
-            self.animation_counter = 0
-            
-            if self.dying and len(self.death_frames) > 0:
-                # Death animation - play through once
-                self.current_frame += 1
-                if self.current_frame >= len(self.death_frames):
-                    self.current_frame = len(self.death_frames) - 1  # Stay on last frame
-            elif not self.dying and len(self.walk_frames) > 0:
-                # Walking animation - loop continuously
-                self.current_frame = (self.current_frame + 1) % len(self.walk_frames)
-        
+        counter = self.anim_counter[sl]
+        counter += tables['animation_speed'][types]
+        step = counter >= 1
+        counter[step] = 0
+        frame = self.frame[sl]
+        # Death animation - play through once, walking animation - loop continuously
+        death_count = tables['death_frames'][types]
+        walk_count = tables['walk_frames'][types]
+        death_step = step & dying & (death_count > 0)
+        frame[death_step] = np.minimum(frame[death_step] + 1, death_count[death_step] - 1)
+        walk_step = step & ~dying & (walk_count > 0)
+        frame[walk_step] = (frame[walk_step] + 1) % walk_count[walk_step]
+
+        if self.__needs_reclaim:
+            self.reclaim()
         return money_earned
 
     def draw(self, srf, cam_x, terrain):
-        """Draw zombie on screen"""
-        if self.alive or self.dying:
-            sx = self.x - cam_x + 1024//3 - self.rect.width//2
-            sy = terrain.get_ground_height(self.x) - self.rect.height
-            self.rect.topleft = (sx, sy)
-            
-            # Draw current animation frame
-            if self.dying and self.death_frames:
-                frame = self.death_frames[int(self.current_frame)]
-                srf.blit(frame, self.rect)
-            elif not self.dying and self.walk_frames:
-                frame = self.walk_frames[int(self.current_frame)]
-                srf.blit(frame, self.rect)
+        """Draw the zombies on screen"""
+        lo, hi = self.window(cam_x)
+        if lo == hi:
+            return
+        sl = slice(lo, hi)
+        tables = self.__tables()
+        types = self.type_id[sl]
+        sx, sy, w, h = self.__screen_rects(sl, types, cam_x, terrain, tables)
+        visible = np.nonzero(self.alive[sl] | self.dying[sl])[0]
+
+        blits = []
+        dying = self.dying[sl]
+        frames = self.frame[sl]
+        for i in visible.tolist():
+            zombie_type = self.types[types[i]]
+            animation = zombie_type.death_frames if dying[i] else zombie_type.walk_frames
+            if animation:
+                blits.append((animation[frames[i]], (int(sx[i]), int(sy[i]))))
             else:
                 # Fallback if no animation loaded
-                pygame.draw.rect(srf, (0,200,0), self.rect, border_radius=4)
-
+                pygame.draw.rect(srf, (0,200,0), (int(sx[i]), int(sy[i]), int(w[i]), int(h[i])), border_radius=4)
+        srf.blits(blits, doreturn=False)
 
-class fatZombie:
-    def __init__(self, x):
-        self.x = x
-        self.__set_health(1)
-        self.alive = True
-        self.dying = False
-        self.death_timer = 0
-        self.death_duration = 30  # frames for death animation
+    def __len__(self):
+        return self.count
 
-    def __set_health(self, level):
-        #health word per level exponentieel verhoogd met 10%
-        self.__health = 200 * (1.1 ** level)
-        
-        # Load animations using the correct relative paths
-        walk_path = os.path.join("images", "fat-zombie")
-        death_path = os.path.join("images", "fat-zombie-damaged")
-        
-        print(f"Attempting to load walk animation from: {walk_path}")
-        print(f"Path exists: {os.path.exists(walk_path)}")
-        
-        # filenames in images/fat-zombie use 'fatzombie3-ezgif.com-crop' (lowercase)
-        self.walk_frames = load_animation(walk_path, "fatzombie3-ezgif.com-crop")
-        # damaged frames are gifs and use 'fatzombieDamaged-ezgif.com-crop'
-        self.death_frames = load_animation(death_path, "fatzombieDamaged-ezgif.com-crop")
-        
-        if not self.walk_frames:
-            print("ERROR: Could not load walk animation frames!")
-            print(f"Current working directory: {os.getcwd()}")
-            if os.path.exists(walk_path):
-                print(f"Files in {walk_path}:")
-                print(os.listdir(walk_path))
-        
-        self.current_frame = 0
-        self.animation_speed = 0.15
-        self.animation_counter = 0
-        
-        if self.walk_frames:
-            self.rect = self.walk_frames[0].get_rect()
-        else:
-            self.rect = pygame.Rect(0, 0, 22, 40)
-
-    def load_zombie_animation(self, folder, base_name):
-
-
-
-
-
-
-
-        """Load animation frames from `folder`.
-
-        Behavior:
-        - Try the unnumbered file first: `<base_name>.<ext>`
-        - Then load numbered frames starting at 1: `<base_name> (1).<ext>`, `<base_name> (2).<ext>`, ...
-        - Supports `.png`, `.gif`, `.jpg`, `.jpeg` and is tolerant to missing files.
-        """
-        frames = []
-
-        if not os.path.exists(folder):
-            print(f"Warning: Folder not found: {folder}")
-            return frames
-
-        exts = [".png", ".gif", ".jpg", ".jpeg"]
-
-        def _safe_load(path):
-            try:
-                img = pygame.image.load(path)
-                try:
-                    img = img.convert_alpha()
-                except Exception:
-                    img = img.convert()
-                img = pygame.transform.scale(img, (110, 100))
-                return img
-            except Exception as e:
-                print(f"Error loading {path}: {e}")
-                return None
-
-        # 1) try unnumbered base file
-        for ext in exts:
-            candidate = os.path.join(folder, f"{base_name}{ext}")
-            if os.path.exists(candidate):
-                img = _safe_load(candidate)
-                if img is not None:
-                    frames.append(img)
-                break
-
-        # 2) numbered frames starting at 1
-        i = 1
-        while True:
-            found = False
-            for ext in exts:
-                candidate = os.path.join(folder, f"{base_name} ({i}){ext}")
-                if os.path.exists(candidate):
-                    img = _safe_load(candidate)
-                    if img is not None:
-                        frames.append(img)
-                        found = True
-                        break
-            if not found:
-                break
-            i += 1
-
-        print(f"Loaded {len(frames)} frames from {folder}")
-        return frames
+def spawn_stream(level, seed):
+    """Endless spawn table of a level: yields (x, type_id) with increasing x.
 
-    def update(self, car, terrain):
-        """Update zombie and check collision with car. Returns money earned."""
-        money_earned = 0
-        
-        if self.alive and not self.dying:
-            if self.rect.colliderect(car.rect):
-                self.dying = True
-                self.death_timer = 0
-                self.current_frame = 0
-                damage = max(0, 10 - car.damage_reduction)
-                car.take_damage(damage)
-                money_earned = 10
-        
-        if self.dying:
-            self.death_timer += 1
-            if self.death_timer >= self.death_duration:
-                self.alive = False
-        
-        # Update animation frame
-        self.animation_counter += self.animation_speed
-        if self.animation_counter >= 1:
-            self.animation_counter = 0
-            
-            if self.dying and len(self.death_frames) > 0:
-                # Death animation - play through once
-                self.current_frame += 1
-                if self.current_frame >= len(self.death_frames):
-                    self.current_frame = len(self.death_frames) - 1  # Stay on last frame
-            elif not self.dying and len(self.walk_frames) > 0:
-                # Walking animation - loop continuously
-                self.current_frame = (self.current_frame + 1) % len(self.walk_frames)
-        
-        return money_earned
+    Same level and seed give the same zombies. Hogere levels hebben meer
+    zombies en meer verschillende soorten.
+    """
+    rng = random.Random(seed * 1000 + level)
+    mean_gap = max(150, 2000 / level)  # Level 1: gemiddeld om de 2000 pixels een zombie
+    fat_chance = max(0.3, 1 / (level ** 0.5))  # Level 1: alleen dikke zombies
+    x = 800
+    while True:
+        x += rng.uniform(0.5, 1.5) * mean_gap
+        type_id = FAT_ZOMBIE if rng.random() < fat_chance else NORMAL_ZOMBIE
+        yield int(x), type_id
+
+
+class ZombieSpawner:
+    """Zet zombies pas in de horde als de auto in de buurt komt.
+
+    Alleen zombies tot LOOKAHEAD pixels voor de auto bestaan, en zombies ver
+    achter de auto worden weer opgeruimd, dus ook een eindeloos level gebruikt
+    een vaste hoeveelheid geheugen.
+    """
 
-    def draw(self, srf, cam_x, terrain):
-        """Draw zombie on screen"""
-        if self.alive or self.dying:
-            sx = self.x - cam_x + 1024//3 - self.rect.width//2
-            sy = terrain.get_ground_height(self.x) - self.rect.height
-            self.rect.topleft = (sx, sy)
-            
-            # Draw current animation frame
-            if self.dying and self.death_frames:
-                frame = self.death_frames[int(self.current_frame)]
-                srf.blit(frame, self.rect)
-            elif not self.dying and self.walk_frames:
-                frame = self.walk_frames[int(self.current_frame)]
-                srf.blit(frame, self.rect)
-            else:
-                # Fallback if no animation loaded
-                pygame.draw.rect(srf, (0,200,0), self.rect, border_radius=4)
-
-def spawn_zombies(level):
-    if level < 2:
-        zombies = []
-        # Spawn 3 zombies at random positions
-        for i in range(3):
-            x = random.randint(800 + i * 2000, 2500 + i * 2000)
-            zombies.append(fatZombie(x))
-        return zombies
\ No newline at end of file
+    def __init__(self, level, seed, zombies):
+        self.LOOKAHEAD = 1500  # Tot hoe ver voor de auto er zombies gemaakt worden
+        self.DESPAWN_BEHIND = 1200  # Zombies verder dan dit achter de auto worden verwijderd
+        self.level = level
+        self.zombies = zombies
+        self.__stream = spawn_stream(level, seed)
+        self.__next = next(self.__stream)
+
+    def update(self, world_x):
+        """Spawn the zombies that came within the look-ahead window, drop the ones far behind"""
+        while self.__next[0] <= world_x + self.LOOKAHEAD:
+            x, type_id = self.__next
+            self.zombies.add(x, type_id, self.level)
+            self.__next = next(self.__stream)
+        self.zombies.despawn_before(world_x - self.DESPAWN_BEHIND)